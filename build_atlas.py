@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import numpy as np
+from PIL import Image
+
+# Offline texture atlas builder. Scales every sprite the game uses to the
+# size it is drawn at, packs them into one image and writes a JSON index
+# of where each one ended up. The game loads the atlas once
+# (src/sprites.py) and draws entities by blitting pieces of it.
+#
+#   python build_atlas.py                 # assets/atlas.png + assets/atlas.json
+#   python build_atlas.py --scale 1 2     # also atlas@2x.png for 2x displays
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# name: (source file, size in world pixels at scale 1, round)
+# Round sprites get a circular alpha mask, which also drops the
+# backgrounds the source art was generated with.
+SPRITES = {
+    "player": ("player.png", 44, True),    # drawn inside the 25px body circle
+    "enemy": ("enemy.png", 40, True),      # Horde radius 20
+    "bullet": ("bullet.png", 16, True),    # Projectile radius 8
+    "super": ("bullet.png", 44, True),     # super radius 22
+    "wall": ("wall.png", 64, False),       # tiled over each wall
+    "ground": ("ground.png", 128, False),  # tiled over the arena
+}
+PADDING = 2
+
+
+def load_sprite(path, size, round_mask):
+    img = Image.open(path).convert("RGBA").resize((size, size), Image.LANCZOS)
+    if round_mask:
+        pixels = np.asarray(img).copy()
+        ys, xs = np.mgrid[0:size, 0:size]
+        centre = (size - 1) / 2.0
+        # 1px anti-aliased edge
+        edge = np.clip(size / 2.0 - np.sqrt((xs - centre)**2 + (ys - centre)**2), 0.0, 1.0)
+        pixels[:, :, 3] = (pixels[:, :, 3] * edge).astype(np.uint8)
+        img = Image.fromarray(pixels, "RGBA")
+    return img
+
+
+def pack(sizes, width):
+    """Shelf packing, tallest first. sizes is {name: (w, h)}.
+
+    Returns ({name: (x, y)}, total height).
+    """
+    positions = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: -item[1][1]):
+        if x + w > width:
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+        positions[name] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def build(assets_dir, scale, width=512):
+    images = {}
+    for name, (filename, size, round_mask) in SPRITES.items():
+        images[name] = load_sprite(os.path.join(assets_dir, filename), max(1, round(size * scale)), round_mask)
+    positions, height = pack({name: img.size for name, img in images.items()}, width)
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    index = {}
+    for name, img in images.items():
+        x, y = positions[name]
+        atlas.paste(img, (x, y))
+        index[name] = {"x": x, "y": y, "w": img.width, "h": img.height}
+
+    suffix = "" if scale == 1 else f"@{scale:g}x"
+    image_name = f"atlas{suffix}.png"
+    atlas.save(os.path.join(assets_dir, image_name))
+    with open(os.path.join(assets_dir, f"atlas{suffix}.json"), "w") as f:
+        json.dump({"image": image_name, "scale": scale, "sprites": index}, f, indent=2)
+    return image_name, atlas.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack game sprites into a texture atlas")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="source and output directory (default: ./assets)")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1.0],
+                        help="target resolution scales, one atlas each (default: 1)")
+    parser.add_argument("--width", type=int, default=512, help="atlas width in pixels")
+    args = parser.parse_args()
+
+    for scale in args.scale:
+        image_name, (w, h) = build(args.assets, scale, args.width)
+        print(f"Wrote {image_name} ({w}x{h}, {len(SPRITES)} sprites)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import threading
+import time
+from collections import deque
+from src.bot import Bot
+from src.server_stats import percentile
+
+# Capacity test: spawns bot clients against a local server.py and reports
+# round-trip time, throughput and dropped connections once per second.
+#
+#   python server.py
+#   python load_test.py --bots 200 --rate 30 --duration 60
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rtts = deque(maxlen=20000)
+        self.messages = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connected = 0
+        self.connect_failures = 0
+        self.dropped = 0
+        self.late_sends = 0
+
+    def snapshot_and_reset(self):
+        with self.lock:
+            rtts = sorted(self.rtts)
+            snap = (rtts, self.messages, self.bytes_sent, self.bytes_received)
+            self.rtts.clear()
+            self.messages = 0
+            self.bytes_sent = 0
+            self.bytes_received = 0
+        return snap
+
+
+def run_bot(server_ip, port, rate, duration, stats, stop):
+    try:
+        bot = Bot(server_ip, port=port)
+    except (ConnectionError, OSError):
+        with stats.lock:
+            stats.connect_failures += 1
+        return
+
+    with stats.lock:
+        stats.connected += 1
+
+    interval = 1.0 / rate
+    next_send = time.perf_counter()
+    end = time.perf_counter() + duration
+    while not stop.is_set() and time.perf_counter() < end:
+        sent_before = bot.net.bytes_sent
+        received_before = bot.net.bytes_received
+        if bot.step() is None:
+            with stats.lock:
+                stats.dropped += 1
+                stats.connected -= 1
+            return
+        with stats.lock:
+            stats.rtts.append(bot.last_rtt)
+            stats.messages += 1
+            stats.bytes_sent += bot.net.bytes_sent - sent_before
+            stats.bytes_received += bot.net.bytes_received - received_before
+
+        next_send += interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Fell behind the configured send rate (slow server replies)
+            next_send = time.perf_counter()
+            with stats.lock:
+                stats.late_sends += 1
+
+    bot.close()
+    with stats.lock:
+        stats.connected -= 1
+
+
+def report_line(elapsed, stats, window):
+    rtts, messages, sent, received = stats.snapshot_and_reset()
+    return (f"{elapsed:6.1f}s  bots={stats.connected:4d}  msgs/s={messages / window:8.1f}  "
+            f"out={sent / window / 1024:8.1f} KB/s  in={received / window / 1024:9.1f} KB/s  "
+            f"rtt p50={percentile(rtts, 50) * 1000:6.2f} p99={percentile(rtts, 99) * 1000:7.2f} "
+            f"max={(rtts[-1] * 1000 if rtts else 0):7.2f} ms  "
+            f"dropped={stats.dropped} failed={stats.connect_failures} late={stats.late_sends}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test server.py with headless bots")
+    parser.add_argument("--server", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555, help="server port (6555 for netsim.py)")
+    parser.add_argument("--bots", type=int, default=50, help="number of bot clients")
+    parser.add_argument("--rate", type=float, default=60.0, help="updates per second per bot")
+    parser.add_argument("--spawn-rate", type=float, default=20.0, help="bots connected per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds each bot plays")
+    args = parser.parse_args()
+
+    stats = LoadStats()
+    stop = threading.Event()
+    threads = []
+    start = time.perf_counter()
+    last_report = start
+
+    print(f"Spawning {args.bots} bots at {args.rate:g} Hz against {args.server}:{args.port}")
+    try:
+        for i in range(args.bots):
+            t = threading.Thread(target=run_bot, args=(args.server, args.port, args.rate, args.duration, stats, stop), daemon=True)
+            t.start()
+            threads.append(t)
+            time.sleep(1.0 / args.spawn_rate)
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                print(report_line(now - start, stats, now - last_report))
+                last_report = now
+
+        while any(t.is_alive() for t in threads):
+            time.sleep(max(0, 1.0 - (time.perf_counter() - last_report)))
+            now = time.perf_counter()
+            print(report_line(now - start, stats, now - last_report))
+            last_report = now
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join(timeout=2)
+
+    print("=" * 40)
+    print(f"Bots requested:      {args.bots}")
+    print(f"Failed to connect:   {stats.connect_failures}")
+    print(f"Dropped mid-match:   {stats.dropped}")
+    print(f"Sends behind rate:   {stats.late_sends}")
+
+
+if __name__ == "__main__":
+    main()
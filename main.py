@@ -10,19 +10,28 @@ pygame.init()
 # SCREEN_HEIGHT = 1080 # Restore this for full HD
 SCREEN_WIDTH = 1920 
 SCREEN_HEIGHT = 1080 
+# Render cap; the game itself always simulates at 60 Hz (0 = uncapped)
 FPS = 60
 
+# World size. Can be bigger than the screen; the camera follows the player.
+# Must match ARENA_WIDTH / ARENA_HEIGHT in server.py
+ARENA_WIDTH = 1920
+ARENA_HEIGHT = 1080
+
 # Mode selection (change this to try different modes)
-# Options: "Knockout", "BrawlBall"
+# Options: "Knockout", "BrawlBall", "Survival"
+# For "BrawlBall" set the same GAME_MODE in server.py (the server runs the ball)
 GAME_MODE = "Knockout"
 
 # Server Configuration
 # If playing on same computer, use "127.0.0.1"
 # If playing on LAN, use the Host computer's IP (e.g., "192.168.1.5")
 SERVER_IP = "127.0.0.1"
+# 5555 connects straight to server.py; 6555 goes through netsim.py
+SERVER_PORT = 5555
 
 # Create and run game
-game = Game(SCREEN_WIDTH, SCREEN_HEIGHT, FPS, GAME_MODE, SERVER_IP)
+game = Game(SCREEN_WIDTH, SCREEN_HEIGHT, FPS, GAME_MODE, SERVER_IP, (ARENA_WIDTH, ARENA_HEIGHT), SERVER_PORT)
 game.run()
 
 pygame.quit()
@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import random
+import time
+
+# Network condition simulator. A local proxy that sits between clients and
+# server.py and makes the link behave like a real one: added latency,
+# jitter, packet loss, reordering and a bandwidth cap, in each direction.
+#
+#   python server.py
+#   python netsim.py --profile 4g                  # listens on 6555
+#   python load_test.py --port 6555 --bots 20      # or SERVER_PORT = 6555 in main.py
+#
+# The game talks TCP, which never loses or reorders bytes; it turns those
+# into delay instead. So for TCP a lost packet is delivered one
+# retransmission timeout late and a reordered one waits for the packet it
+# overtook, and everything behind either of them waits too (head-of-line
+# blocking). With --udp, datagrams really are dropped and reordered.
+
+MSS = 1460  # bytes per simulated packet
+
+# latency and jitter are one-way, in ms; loss and reorder are per packet,
+# in percent; bandwidth is per direction, in kbit/s (0 = unlimited)
+PROFILES = {
+    "lan": {"latency": 1, "jitter": 0.5, "loss": 0.0, "reorder": 0.0, "bandwidth": 0},
+    "4g": {"latency": 35, "jitter": 10, "loss": 0.5, "reorder": 0.5, "bandwidth": 12000},
+    "wifi": {"latency": 20, "jitter": 40, "loss": 3.0, "reorder": 2.0, "bandwidth": 3000},  # congested
+    "none": {"latency": 0, "jitter": 0, "loss": 0.0, "reorder": 0.0, "bandwidth": 0},
+}
+
+
+class LinkStats:
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+        self.lost = 0
+        self.reordered = 0
+        self.delay_total = 0.0
+        self.delay_max = 0.0
+
+    def new_window(self):
+        """Reset the per-interval numbers; lost and reordered keep counting"""
+        self.packets = self.bytes = 0
+        self.delay_total = self.delay_max = 0.0
+
+    def add(self, size, delay):
+        self.packets += 1
+        self.bytes += size
+        self.delay_total += delay
+        self.delay_max = max(self.delay_max, delay)
+
+    def summary(self, seconds):
+        avg = self.delay_total / self.packets * 1000 if self.packets else 0.0
+        return (f"{self.packets / seconds:7.1f} pkt/s {self.bytes / seconds / 1024:8.1f} KB/s  "
+                f"delay avg={avg:6.1f} max={self.delay_max * 1000:6.1f} ms  "
+                f"lost={self.lost} reordered={self.reordered}")
+
+
+class Link:
+    """One direction of a simulated connection.
+
+    A packet arrives at transmit() (once the link has had time to send it
+    at the capped bandwidth) + propagation() (latency +- jitter). Loss and
+    reordering are decided per packet.
+    """
+    def __init__(self, latency, jitter, loss, reorder, bandwidth, rng, stats):
+        self.latency = latency / 1000.0
+        self.jitter = jitter / 1000.0
+        self.loss = loss / 100.0
+        self.reorder = reorder / 100.0
+        self.bytes_per_second = bandwidth * 1000 / 8.0
+        self.rng = rng
+        self.stats = stats
+        self.free_at = 0.0
+
+    def transmit(self, size, now):
+        """Serialization: when the last byte of this packet has left"""
+        if self.bytes_per_second:
+            self.free_at = max(self.free_at, now) + size / self.bytes_per_second
+            return self.free_at
+        return now
+
+    def propagation(self):
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def retransmit_timeout(self):
+        # Fast retransmit after about a round trip, never under Linux's 200 ms RTO floor
+        return max(0.2, 2 * (self.latency + self.jitter))
+
+    def lost(self):
+        if self.loss and self.rng.random() < self.loss:
+            self.stats.lost += 1
+            return True
+        return False
+
+    def reordered(self):
+        if self.reorder and self.rng.random() < self.reorder:
+            self.stats.reordered += 1
+            return True
+        return False
+
+
+async def pump_tcp(reader, writer, link):
+    """Copy reader to writer through link, keeping TCP's in-order delivery"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    async def deliver():
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            at, data = item
+            delay = at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    sender = asyncio.ensure_future(deliver())
+    last = 0.0
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            now = loop.time()
+            for i in range(0, len(data), MSS):
+                packet = data[i:i + MSS]
+                at = link.transmit(len(packet), now) + link.propagation()
+                if link.lost():
+                    at += link.retransmit_timeout()
+                elif link.reordered():
+                    # Overtaken by the next packet, then held until the gap fills
+                    at += link.propagation()
+                # Nothing gets ahead of an earlier packet
+                at = max(at, last)
+                last = at
+                link.stats.add(len(packet), at - now)
+                queue.put_nowait((at, packet))
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        queue.put_nowait(done)
+        try:
+            await sender
+        except (ConnectionError, OSError):
+            pass
+
+
+class TcpProxy:
+    def __init__(self, target, settings, rng):
+        self.target = target
+        self.settings = settings
+        self.rng = rng
+        self.up = LinkStats()    # client -> server
+        self.down = LinkStats()  # server -> client
+        self.connections = 0
+
+    async def handle(self, client_reader, client_writer):
+        try:
+            server_reader, server_writer = await asyncio.open_connection(*self.target)
+        except OSError as e:
+            print("Can't reach server:", e)
+            client_writer.close()
+            return
+        self.connections += 1
+        up = Link(rng=self.rng, stats=self.up, **self.settings)
+        down = Link(rng=self.rng, stats=self.down, **self.settings)
+        try:
+            await asyncio.gather(pump_tcp(client_reader, server_writer, up),
+                                 pump_tcp(server_reader, client_writer, down))
+        finally:
+            self.connections -= 1
+
+
+def send_datagram(link, data, send):
+    """Drop data, or call send(data) when it would arrive. Jitter alone
+    reorders datagrams; reordered ones are held back a little longer."""
+    if link.lost():
+        return
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    at = link.transmit(len(data), now) + link.propagation()
+    if link.reordered():
+        at += link.propagation()
+    link.stats.add(len(data), at - now)
+    loop.call_at(at, send, data)
+
+
+class UdpSession(asyncio.DatagramProtocol):
+    """One client's socket to the server; replies go back to its address"""
+    def __init__(self, proxy, addr):
+        self.proxy = proxy
+        self.addr = addr
+        self.transport = None
+        self.up = Link(rng=proxy.rng, stats=proxy.up, **proxy.settings)
+        self.down = Link(rng=proxy.rng, stats=proxy.down, **proxy.settings)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, _):
+        send_datagram(self.down, data, lambda d: self.proxy.transport.sendto(d, self.addr))
+
+    def forward(self, data):
+        send_datagram(self.up, data, lambda d: self.transport.is_closing() or self.transport.sendto(d))
+
+
+class UdpProxy(asyncio.DatagramProtocol):
+    """Datagram relay. Each client address gets its own socket to the server."""
+    def __init__(self, target, settings, rng):
+        self.target = target
+        self.settings = settings
+        self.rng = rng
+        self.up = LinkStats()
+        self.down = LinkStats()
+        self.sessions = {}
+        self.transport = None
+
+    @property
+    def connections(self):
+        return len(self.sessions)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        session = self.sessions.get(addr)
+        if session is None:
+            session = self.sessions[addr] = UdpSession(self, addr)
+            loop = asyncio.get_running_loop()
+            # Datagrams that arrive before the socket is up are lost, like on a real network
+            loop.create_task(loop.create_datagram_endpoint(lambda: session, remote_addr=self.target))
+        if session.transport:
+            session.forward(data)
+
+
+async def report(proxy, interval):
+    last = time.perf_counter()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        elapsed = now - last
+        last = now
+        print(f"conns={proxy.connections:3d}  up: {proxy.up.summary(elapsed)}")
+        print(f"           down: {proxy.down.summary(elapsed)}")
+        proxy.up.new_window()
+        proxy.down.new_window()
+
+
+async def run(args, settings):
+    rng = random.Random(args.seed)
+    host, _, port = args.target.rpartition(":")
+    target = (host or "127.0.0.1", int(port))
+    loop = asyncio.get_running_loop()
+    if args.udp:
+        proxy = UdpProxy(target, settings, rng)
+        await loop.create_datagram_endpoint(lambda: proxy, local_addr=(args.listen_host, args.listen))
+    else:
+        proxy = TcpProxy(target, settings, rng)
+        await asyncio.start_server(proxy.handle, args.listen_host, args.listen)
+    print(f"{'UDP' if args.udp else 'TCP'} {args.listen_host}:{args.listen} -> {target[0]}:{target[1]}  "
+          + "  ".join(f"{k}={v:g}" for k, v in settings.items()))
+    await report(proxy, args.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay traffic to the server through a simulated network")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="lan")
+    parser.add_argument("--listen", type=int, default=6555, help="port clients connect to")
+    parser.add_argument("--listen-host", default="127.0.0.1")
+    parser.add_argument("--target", default="127.0.0.1:5555", help="server host:port")
+    parser.add_argument("--udp", action="store_true", help="relay datagrams instead of a TCP stream")
+    parser.add_argument("--latency", type=float, help="one-way delay, ms (overrides the profile)")
+    parser.add_argument("--jitter", type=float, help="+- ms added to each packet's delay")
+    parser.add_argument("--loss", type=float, help="packet loss, percent")
+    parser.add_argument("--reorder", type=float, help="packets delivered out of order, percent")
+    parser.add_argument("--bandwidth", type=float, help="kbit/s per direction, 0 = unlimited")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable runs")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between stats lines")
+    args = parser.parse_args()
+
+    settings = dict(PROFILES[args.profile])
+    for key in settings:
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    try:
+        asyncio.run(run(args, settings))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,126 @@
+import argparse
+import fnmatch
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from PIL import Image
 
-def make_transparent(img_path):
-    if not os.path.exists(img_path):
-        return
-    img = Image.open(img_path)
-    img = img.convert("RGBA")
-    datas = img.getdata()
-
-    new_data = []
-    # AI generated "white backgrounds" are usually 255,255,255 or very close.
-    # We remove anything where all RGB components are > 230.
-    for item in datas:
-        # If it's a "bright" pixel (near white)
-        if item[0] > 230 and item[1] > 230 and item[2] > 230:
-            # Make it fully transparent
-            new_data.append((255, 255, 255, 0))
-        else:
-            new_data.append(item)
-
-    img.putdata(new_data)
-    img.save(img_path, "PNG")
-
-assets_dir = "/Users/paultanchi/Rip off Brawl stars/assets"
-files = ["player.png", "enemy.png", "bullet.png", "wall.png"]
-
-for f in files:
-    print(f"Processing {f}...")
-    make_transparent(os.path.join(assets_dir, f))
+# Asset pipeline: knocks the near-white background out of AI-generated
+# sprites. Works on whole arrays instead of pixel by pixel, runs one
+# process per core, and remembers the content hash of every output so
+# files that haven't changed since the last run are skipped.
+#
+#   python process_assets.py                  # every png in ./assets, in place
+#   python process_assets.py art/ --out assets --soft 20
+
+CACHE_NAME = ".asset_cache.json"
+EXTENSIONS = (".png",)
+# ground.png has no background, and build_atlas.py writes its atlases
+# (already keyed sprites) into the same directory
+DEFAULT_SKIP = ["ground.png", "atlas*.png"]
+
+
+def color_key(pixels, threshold=230, soft=0):
+    """Make near-white pixels transparent. pixels is an (h, w, 4) uint8 array.
+
+    AI generated "white backgrounds" are usually 255,255,255 or very close,
+    so anything where all RGB components are > threshold goes. With soft > 0
+    the alpha also fades over the `soft` brightness levels up to threshold,
+    which keeps anti-aliased edges from getting a white fringe; what hard
+    keying removes (and only that) still ends up fully transparent.
+    """
+    darkest = pixels[:, :, :3].min(axis=2).astype(np.float32)
+    if soft > 0:
+        # 1 at threshold - soft and darker, 0 from threshold + 1 up
+        keep = np.clip((threshold + 1 - darkest) / (soft + 1), 0.0, 1.0)
+    else:
+        keep = (darkest <= threshold).astype(np.float32)
+    out = pixels.copy()
+    out[:, :, 3] = (pixels[:, :, 3] * keep).round().astype(np.uint8)
+    out[keep == 0] = (255, 255, 255, 0)
+    return out
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def process_file(src, dst, threshold, soft):
+    """Worker: key one image and return the hash of what was written"""
+    with Image.open(src) as img:
+        pixels = np.asarray(img.convert("RGBA"))
+    Image.fromarray(color_key(pixels, threshold, soft), "RGBA").save(dst, "PNG")
+    return file_hash(dst)
+
+
+def load_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Color-key sprite backgrounds to transparent")
+    parser.add_argument("assets_dir", nargs="?",
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets"),
+                        help="directory of source images (default: ./assets)")
+    parser.add_argument("--out", help="write results here instead of overwriting the sources")
+    parser.add_argument("--threshold", type=int, default=230,
+                        help="pixels brighter than this in every channel become transparent")
+    parser.add_argument("--soft", type=int, default=0,
+                        help="fade alpha over this many brightness levels below the threshold")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and redo every file")
+    parser.add_argument("--skip", nargs="*", default=DEFAULT_SKIP,
+                        help="file names or glob patterns to leave alone (default: ground.png atlas*.png)")
+    args = parser.parse_args()
+
+    out_dir = args.out or args.assets_dir
+    os.makedirs(out_dir, exist_ok=True)
+    cache_path = os.path.join(out_dir, CACHE_NAME)
+    cache = {} if args.force else load_cache(cache_path)
+    settings = {"threshold": args.threshold, "soft": args.soft}
+
+    # An entry is fresh if the source is unchanged since we last processed
+    # it (or, in place, is exactly what we wrote) and the output is intact
+    jobs = []
+    skipped = 0
+    for name in sorted(os.listdir(args.assets_dir)):
+        if not name.lower().endswith(EXTENSIONS) or any(fnmatch.fnmatch(name, p) for p in args.skip):
+            continue
+        src = os.path.join(args.assets_dir, name)
+        dst = os.path.join(out_dir, name)
+        src_hash = file_hash(src)
+        entry = cache.get(name)
+        if (entry and entry["settings"] == settings and os.path.exists(dst)
+                and src_hash in (entry["source"], entry["output"])
+                and file_hash(dst) == entry["output"]):
+            skipped += 1
+            continue
+        jobs.append((name, src, dst, src_hash))
+
+    start = time.perf_counter()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [(name, src_hash, pool.submit(process_file, src, dst, args.threshold, args.soft))
+                       for name, src, dst, src_hash in jobs]
+            for name, src_hash, future in futures:
+                cache[name] = {"source": src_hash, "output": future.result(), "settings": settings}
+                print(f"Processed {name}")
+        with open(cache_path, "w") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+
+    print(f"{len(jobs)} processed, {skipped} unchanged, {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
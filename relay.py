@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import time
+from collections import deque
+from src.protocol import HEADER, check_frame_size
+from src.spectator import FEED_PORT, RELAY_PORT
+
+# Spectator relay. Subscribes once to a match's spectator feed and fans it
+# out to any number of viewers, optionally on a broadcast delay. Frames are
+# forwarded as the bytes they arrived as: nothing is unpickled or
+# re-encoded, so each viewer costs one buffered write per tick.
+#
+#   python server.py
+#   python relay.py --delay 30                       # viewers connect to :5558
+#   python relay.py --source 10.0.0.5:5558 --listen 5559   # relay of a relay
+#   python spectate.py                               # watch
+#
+# A viewer that can't keep up skips frames (every frame is the full world,
+# so nothing is lost but smoothness) instead of making the relay buffer
+# for it.
+
+# Frames a viewer may have queued before it starts skipping
+MAX_BACKLOG = 8
+
+
+async def read_frame(reader):
+    """One framed message, header included, exactly as it came off the wire"""
+    header = await reader.readexactly(HEADER.size)
+    (size,) = HEADER.unpack(header)
+    check_frame_size(size)  # ConnectionError: the caller drops the feed
+    return header + await reader.readexactly(size)
+
+
+class Viewer:
+    def __init__(self, writer):
+        self.writer = writer
+        self.skipped = 0
+
+
+class Relay:
+    def __init__(self, source, delay, max_viewers):
+        self.source = source
+        self.delay = delay
+        self.max_viewers = max_viewers
+        self.hello = None
+        self.ready = asyncio.Event()
+        self.viewers = set()
+        # (time it may go out, frame), oldest first
+        self.pending = deque()
+        self.frame_arrived = asyncio.Event()
+        self.frames_in = 0
+        self.bytes_out = 0
+        self.skipped = 0
+
+    async def subscribe(self):
+        """Read the upstream feed forever, reconnecting if it drops"""
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(*self.source)
+            except OSError as e:
+                print(f"Can't reach {self.source[0]}:{self.source[1]} ({e}), retrying")
+                await asyncio.sleep(2)
+                continue
+            try:
+                self.hello = await read_frame(reader)
+                self.ready.set()
+                print(f"Subscribed to {self.source[0]}:{self.source[1]}")
+                while True:
+                    frame = await read_frame(reader)
+                    self.frames_in += 1
+                    self.pending.append((time.monotonic() + self.delay, frame))
+                    self.frame_arrived.set()
+            except (asyncio.IncompleteReadError, OSError):
+                print("Feed lost, reconnecting")
+            finally:
+                writer.close()
+            await asyncio.sleep(1)
+
+    async def broadcast(self):
+        """Send each frame to every viewer once its delay is up"""
+        while True:
+            if not self.pending:
+                self.frame_arrived.clear()
+                await self.frame_arrived.wait()
+                continue
+            due, frame = self.pending[0]
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            self.pending.popleft()
+            limit = MAX_BACKLOG * len(frame)
+            for viewer in self.viewers:
+                transport = viewer.writer.transport
+                if transport.is_closing():
+                    continue
+                if transport.get_write_buffer_size() > limit:
+                    viewer.skipped += 1
+                    self.skipped += 1
+                    continue
+                viewer.writer.write(frame)
+                self.bytes_out += len(frame)
+
+    async def handle_viewer(self, reader, writer):
+        if len(self.viewers) >= self.max_viewers:
+            writer.close()
+            return
+        await self.ready.wait()
+        viewer = Viewer(writer)
+        writer.write(self.hello)
+        self.viewers.add(viewer)
+        try:
+            # Viewers don't talk; this just notices when they leave
+            while await reader.read(1024):
+                pass
+        except OSError:
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            writer.close()
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(f"viewers={len(self.viewers):5d}  in={self.frames_in / interval:5.1f} frames/s  "
+                  f"out={self.bytes_out / interval / 1024 / 1024:7.2f} MB/s  "
+                  f"held={len(self.pending)}  skipped={self.skipped}")
+            self.frames_in = 0
+            self.bytes_out = 0
+
+
+async def run(args):
+    host, _, port = args.source.rpartition(":")
+    relay = Relay((host or "127.0.0.1", int(port)), args.delay, args.max_viewers)
+    await asyncio.start_server(relay.handle_viewer, args.listen_host, args.listen, backlog=1024)
+    print(f"Relaying {args.source} on port {args.listen} with a {args.delay:g}s delay")
+    await asyncio.gather(relay.subscribe(), relay.broadcast(), relay.report(args.interval))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan a match's spectator feed out to many viewers")
+    parser.add_argument("--source", default=f"127.0.0.1:{FEED_PORT}",
+                        help="server.py spectator feed or another relay (host:port)")
+    parser.add_argument("--listen", type=int, default=RELAY_PORT, help="port viewers connect to")
+    parser.add_argument("--listen-host", default="0.0.0.0")
+    parser.add_argument("--delay", type=float, default=0.0, help="broadcast delay in seconds")
+    parser.add_argument("--max-viewers", type=int, default=10000)
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between stats lines")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
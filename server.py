@@ -1,12 +1,71 @@
 import socket
 from _thread import *
 import pickle
+import math
+import traceback
 import time
 import random
+import atexit
+from collections import deque
+from src.replay import ReplayWriter
+from src.server_stats import ServerStats
+from src.protocol import send_msg, recv_frame, send_encoded
+from src.visibility import VisibilityGrid
+from src.ball import BallPhysics, team_side
+from src.physics import segment_circle, segment_aabb
+from src.spawn import SpawnService
+from src.timer_wheel import TimerWheel
+from src.snapshot import SnapshotPublisher
+from src.lag_compensation import LagCompensator
+from src.spectator import FEED_PORT
+from src.send_scheduler import SendScheduler, MAX_BANDWIDTH, EMPTY_FRAME
+from src.quantize import ID_BITS
 
 server = ""
 port = 5555
 
+# Must match GAME_MODE in main.py. In "BrawlBall" the server owns the ball.
+GAME_MODE = "Knockout"
+# Must match ARENA_WIDTH / ARENA_HEIGHT in main.py
+ARENA_WIDTH = 1920
+ARENA_HEIGHT = 1080
+# Server simulation rate (Hz) for hit detection and the Brawl Ball. Hits
+# are swept along each projectile's path since the previous tick, so 20-30
+# Hz is as accurate as testing every 60fps frame.
+TICK_RATE = 30
+# Lag compensation (see src/lag_compensation.py): shots are tested against
+# where targets were on the shooter's screen, up to LAG_COMP_WINDOW seconds
+# back. Players with more lag than that have to lead their shots.
+LAG_COMPENSATION = True
+LAG_COMP_WINDOW = 0.5
+# Weight of each new round-trip sample in the per-connection RTT average
+RTT_SMOOTHING = 0.1
+# Per-client send rate and byte budget (see src/send_scheduler.py). Each
+# client gets at most its share of MAX_EGRESS bytes/s.
+ADAPTIVE_SEND = True
+MAX_EGRESS = 8 * 1024 * 1024
+
+# Match recording (see src/replay.py). Set RECORD_REPLAY = True to write
+# one record per tick of world state to REPLAY_PATH.
+RECORD_REPLAY = False
+REPLAY_PATH = "match_" + time.strftime("%Y%m%d_%H%M%S") + ".nwr"
+REPLAY_TICK_RATE = 30
+
+# Instrumentation (see src/server_stats.py). Per-phase timings are always
+# collected; a summary is printed every STATS_LOG_INTERVAL seconds and the
+# full report is served on 127.0.0.1:STATS_PORT ("stats", "profile on",
+# "profile off").
+STATS_LOG_INTERVAL = 10
+STATS_PORT = 5556
+stats = ServerStats()
+
+# Spectators (see src/spectator.py): relay.py subscribes here once and fans
+# the stream out to viewers, so watching costs the server one full-state
+# send per tick per relay, however many people watch.
+SPECTATOR_PORT = FEED_PORT
+MAX_SPECTATOR_FEEDS = 4
+spectator_feeds = set()
+
 s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
 try:
@@ -14,55 +73,375 @@ try:
 except socket.error as e:
     str(e)
 
-s.listen(4)
+s.listen(128) # room for load tests connecting many bots at once
 print("Waiting for a connection, Server Started")
 
 # Game State
+# The simulation thread (game_tick) is the only one that touches these.
+# Connection threads post to the inbox below and read the published
+# snapshot (see publish_snapshot), so nobody iterates a dict that another
+# thread is resizing.
 players = {}
 # dead_players: {player_id: death_timestamp}
 dead_players = {}
+# Where each projectile was at the previous tick: {player_id: {proj_id: (x, y)}}
+projectile_trails = {}
+# Projectiles the server already used up; ignored if a client sends them
+# again before it has seen the removal: {player_id: set(proj_id)}
+spent_projectiles = {}
 
-# Simple counter for player IDs
-current_id_counter = 0
+# Inbox from the connection threads, drained at the start of every tick.
+# deque appends/pops and single dict stores are atomic, so no lock is needed.
+joins = deque()    # new player dicts
+leaves = deque()   # player ids that disconnected
+inputs = {}        # {player_id: latest update from that client}
+view_times = {}    # {player_id: time of the world that client was looking at}
 
-# Wall rectangles (x, y, w, h) - MUST MATCH src/modes.py Knockout walls
-# center_x = 960, center_y = 540
+# Player ids go on the wire in ID_BITS bits (src/quantize.py), so they
+# are recycled: a leaving player's id goes to the back of free_ids once the
+# simulation has forgotten them. Fresh ids are used up first, so an id is
+# reused as long after its player left as possible.
+free_ids = deque()
+next_player_id = 0
+
+def allocate_player_id():
+    """A player id below 2**ID_BITS, or None if they are all in use"""
+    global next_player_id
+    if next_player_id < 1 << ID_BITS:
+        next_player_id += 1
+        return next_player_id - 1
+    if free_ids:
+        return free_ids.popleft()
+    return None
+
+# Wall rectangles (x, y, w, h) - MUST MATCH the walls of GAME_MODE in
+# src/modes.py (create_arena_walls; Brawl Ball has none). Shots, spawns,
+# fog of war and the ball all use this list.
+center_x = ARENA_WIDTH // 2
+center_y = ARENA_HEIGHT // 2
 WALL_RECTS = [
-    (960 - 300, 540 - 250, 120, 150), # Top-left
-    (960 + 180, 540 - 250, 120, 150), # Top-right
-    (960 - 300, 540 + 100, 120, 150), # Bottom-left
-    (960 + 180, 540 + 100, 120, 150), # Bottom-right
-    (960 - 80, 540 - 120, 160, 80),  # Top-center
-    (960 - 80, 540 + 40, 160, 80)    # Bottom-center
+    (center_x - 300, center_y - 250, 120, 150), # Top-left
+    (center_x + 180, center_y - 250, 120, 150), # Top-right
+    (center_x - 300, center_y + 100, 120, 150), # Bottom-left
+    (center_x + 180, center_y + 100, 120, 150), # Bottom-right
+    (center_x - 80, center_y - 120, 160, 80),  # Top-center
+    (center_x - 80, center_y + 40, 160, 80)    # Bottom-center
 ]
+if GAME_MODE == "BrawlBall":
+    WALL_RECTS = []
+
+# Fog of war: when enabled each client only receives the players it has
+# line of sight to (see src/visibility.py)
+FOG_OF_WAR = False
+visibility = VisibilityGrid(ARENA_WIDTH, ARENA_HEIGHT, WALL_RECTS) if FOG_OF_WAR else None
+
+def visible_ids(p_id, snapshot_players):
+    """Players p_id can see in a snapshot, or None for everyone. Dead players see everyone."""
+    me = snapshot_players.get(p_id)
+    if not FOG_OF_WAR or not me or not me["alive"]:
+        return None
+    viewer = (me["x"], me["y"])
+    return [other_id for other_id, other in snapshot_players.items()
+            if other_id == p_id or visibility.can_see(viewer, (other["x"], other["y"]))]
+
+# World state is serialized once per tick (see src/snapshot.py) and the
+# same bytes are sent to every client
+publisher = SnapshotPublisher()
+
+# Recent positions of every player, for rewinding targets in resolve_hits
+history = LagCompensator(LAG_COMP_WINDOW, TICK_RATE)
+
+def publish_snapshot(current_time):
+    """Copy the simulation's state into an immutable snapshot and swap it in.
+    Runs at the end of each tick on the simulation thread."""
+    world = {}
+    for p_id, p in players.items():
+        entry = dict(p)
+        entry["projectiles"] = list(p["projectiles"])
+        # Projectiles the server used up, so the owner can remove them
+        entry["spent"] = list(spent_projectiles.get(p_id, ()))
+        world[p_id] = entry
+    return publisher.publish(world, ball.state() if ball else None, current_time)
+
+# Brawl Ball: one authoritative ball, stepped in game_tick() and sent to
+# every client with the players
+ball = BallPhysics(ARENA_WIDTH, ARENA_HEIGHT, WALL_RECTS) if GAME_MODE == "BrawlBall" else None
+
+# Spawn points (see src/spawn.py): picked at random from precomputed
+# wall-free spots at least SPAWN_MIN_DISTANCE from every living player
+SPAWN_MIN_DISTANCE = 300
+spawn_service = SpawnService(ARENA_WIDTH, ARENA_HEIGHT, WALL_RECTS, radius=25 + 5, # player radius + 5px buffer
+                             min_distance=SPAWN_MIN_DISTANCE, margin=100)
+
+# Respawns and regen are deadline events on a timer wheel advanced by
+# game_tick(), instead of being polled in every client's receive loop.
+# Each player has at most one pending timer: respawn while dead, regen
+# start after being hit.
+RESPAWN_DELAY = 5.0
+REGEN_DELAY = 2.0
+timers = TimerWheel(resolution=1.0 / TICK_RATE)
+player_timers = {}
+# Players currently healing: {player_id: health when the regen started}
+regenerating = {}
+
+def schedule(p_id, when, callback):
+    pending = player_timers.get(p_id)
+    if pending:
+        pending.cancel()
+    player_timers[p_id] = timers.call_at(when, callback, p_id)
 
-def is_colliding_with_walls(x, y, radius):
-    for rx, ry, rw, rh in WALL_RECTS:
-        # Find closest point on rect to circle center
-        closest_x = max(rx, min(x, rx + rw))
-        closest_y = max(ry, min(y, ry + rh))
+def regen_amount(seconds):
+    """Health regained `seconds` into regen.
+
+    Closed form of the old per-packet integration, where the rate was
+    2.5 + 5 * seconds**2 per second (faster the longer you wait).
+    """
+    return 2.5 * seconds + 5.0 / 3.0 * seconds**3
+
+def start_regen(p_id):
+    player_timers.pop(p_id, None)
+    p = players.get(p_id)
+    if p and p["alive"] and p["health"] < 100:
+        regenerating[p_id] = p["health"]
+
+def update_regen(p_id, current_time):
+    """Bring a healing player's health up to date. Returns False once full."""
+    base = regenerating.get(p_id)
+    p = players.get(p_id)
+    if base is None or p is None:
+        return False
+    seconds = current_time - p["last_damage_time"] - REGEN_DELAY
+    p["health"] = min(100, base + regen_amount(max(0.0, seconds)))
+    return p["health"] < 100
+
+def respawn(p_id):
+    player_timers.pop(p_id, None)
+    p = players.get(p_id)
+    if p is None or p["alive"]:
+        return
+    safe_x, safe_y = get_safe_spawn(p_id)
+    p["x"] = safe_x
+    p["y"] = safe_y
+    p["health"] = 100
+    p["super_charge"] = 0
+    p["last_damage_time"] = time.time()
+    p["alive"] = True
+    dead_players.pop(p_id, None)
+    history.reset(p_id)  # don't interpolate from where they died
+
+def resolve_hits(current_time):
+    """Authority Hit Reg: sweep every projectile from where it was last tick
+    to where it is now and check it against walls and OTHER players"""
+    for p_id, me in players.items():
+        if not me["alive"]:
+            continue
+        old_trails = projectile_trails.get(p_id, {})
+        trails = {}
+        spent = spent_projectiles.setdefault(p_id, set())
+        # Test against the world as this shooter saw it
+        view_time = view_times.get(p_id) if LAG_COMPENSATION else None
         
-        # Calculate distance
-        dist = ((x - closest_x)**2 + (y - closest_y)**2)**0.5
-        if dist < radius + 5: # 5px buffer
-            return True
-    return False
+        for my_proj in me["projectiles"][:]:
+            is_super = my_proj.get("is_super", False)
+            x1, y1 = my_proj["x"], my_proj["y"]
+            # First sighting: just test where it is now
+            x0, y0 = old_trails.get(my_proj["id"], (x1, y1))
+            trails[my_proj["id"]] = (x1, y1)
+            
+            # Reset super charge if a super was fired
+            if is_super:
+                me["super_charge"] = 0
+            
+            # Walls stop projectiles; nothing behind the first wall gets hit
+            wall_t = None
+            for rect in WALL_RECTS:
+                t = segment_aabb(x0, y0, x1, y1, rect)
+                if t is not None and (wall_t is None or t < wall_t):
+                    wall_t = t
+            
+            # Hitbox check along the whole path, earliest hit first
+            hit_radius = 40 if is_super else 35
+            hits = []
+            for other_id, other_p in players.items():
+                if other_id == p_id or not other_p["alive"]:
+                    continue
+                target = None
+                if view_time is not None:
+                    target = history.position_at(other_id, view_time, current_time)
+                tx, ty = target or (other_p["x"], other_p["y"])
+                t = segment_circle(x0, y0, x1, y1, tx, ty, hit_radius)
+                if t is not None and (wall_t is None or t <= wall_t):
+                    hits.append((t, other_id))
+            hits.sort()
+            if not is_super:
+                hits = hits[:1] # Standard bullet hits one
+            
+            for _, other_id in hits:
+                other_p = players[other_id]
+                damage = 100 if is_super else 25
+                update_regen(other_id, current_time)
+                regenerating.pop(other_id, None)
+                other_p["health"] -= damage
+                other_p["last_damage_time"] = current_time
+                
+                if not is_super:
+                    # Charge super on normal hits
+                    me["super_charge"] = min(100, me["super_charge"] + 25)
+                
+                if other_p["health"] <= 0:
+                    other_p["alive"] = False
+                    other_p["health"] = 0
+                    dead_players[other_id] = current_time
+                    schedule(other_id, current_time + RESPAWN_DELAY, respawn)
+                else:
+                    schedule(other_id, current_time + REGEN_DELAY, start_regen)
+            
+            if (hits and not is_super) or wall_t is not None:
+                me["projectiles"].remove(my_proj)
+                spent.add(my_proj["id"])
+                del trails[my_proj["id"]]
+        
+        projectile_trails[p_id] = trails
+
+# Client updates are checked on the connection thread before they reach
+# the simulation, so a malformed one only drops the client that sent it
+MAX_INPUT_PROJECTILES = 64
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"Not a finite number: {value!r}")
+    return float(value)
 
-def get_safe_spawn():
+def clean_input(data):
+    """A client update reduced to the fields the simulation uses, with
+    checked types. Raises ValueError if it isn't a valid update."""
+    if not isinstance(data, dict):
+        raise ValueError("Update is not a dict")
+    projectiles = data.get("projectiles", [])
+    if not isinstance(projectiles, (list, tuple)) or len(projectiles) > MAX_INPUT_PROJECTILES:
+        raise ValueError("Bad projectile list")
+    clean = []
+    for proj in projectiles:
+        if not isinstance(proj, dict):
+            raise ValueError("Projectile is not a dict")
+        proj_id = proj.get("id")
+        if isinstance(proj_id, bool) or not isinstance(proj_id, int) or not 0 <= proj_id < 1 << ID_BITS:
+            raise ValueError(f"Bad projectile id: {proj_id!r}")
+        clean.append({
+            "x": _number(proj.get("x")),
+            "y": _number(proj.get("y")),
+            "vel_x": _number(proj.get("vel_x", 0)),
+            "vel_y": _number(proj.get("vel_y", 0)),
+            "id": proj_id,
+            "is_super": bool(proj.get("is_super", False)),
+        })
+    return {
+        "x": _number(data.get("x")),
+        "y": _number(data.get("y")),
+        "angle": _number(data.get("angle", 0)),
+        "projectiles": clean,
+    }
+
+def apply_input(p_id, data):
+    me = players.get(p_id)
+    if me is None or not me["alive"]:
+        return
+    me["x"] = data["x"]
+    me["y"] = data["y"]
+    me["angle"] = data["angle"]
+    # Drop projectiles the server already used up. Once the client
+    # stops sending an id we can forget it.
+    spent = spent_projectiles.setdefault(p_id, set())
+    incoming = data["projectiles"]
+    if spent:
+        spent &= set(p["id"] for p in incoming)
+        incoming = [p for p in incoming if p["id"] not in spent]
+    me["projectiles"] = incoming
+
+def apply_inbox():
+    while joins:
+        p = joins.popleft()
+        players[p["id"]] = p
+    for p_id in list(inputs):
+        data = inputs.pop(p_id)
+        try:
+            apply_input(p_id, data)
+        except (KeyError, TypeError, ValueError) as e:
+            # clean_input should make this impossible; never let one
+            # player's update stop the tick for everyone
+            print(f"Dropped update from player {p_id}:", e)
+    while leaves:
+        p_id = leaves.popleft()
+        players.pop(p_id, None)
+        inputs.pop(p_id, None)
+        view_times.pop(p_id, None)
+        history.forget(p_id)
+        dead_players.pop(p_id, None)
+        projectile_trails.pop(p_id, None)
+        spent_projectiles.pop(p_id, None)
+        regenerating.pop(p_id, None)
+        pending = player_timers.pop(p_id, None)
+        if pending:
+            pending.cancel()
+        spawn_service.untrack(p_id)
+        free_ids.append(p_id)
+
+def run_tick(frames):
+    """One simulation step: inputs, timers, hits, ball, then publish"""
+    tick_start = t = stats.now()
+    apply_inbox()
+    t = stats.record("inputs", t)
+    current_time = time.time()
+    timers.advance(current_time)
+    # After respawns so a teleport starts a fresh trail
+    for p_id, p in players.items():
+        if p["alive"]:
+            history.record(p_id, current_time, p["x"], p["y"])
+    for p_id in list(regenerating):
+        if not update_regen(p_id, current_time):
+            regenerating.pop(p_id, None)
+    t = stats.record("timers", t)
+    resolve_hits(current_time)
+    t = stats.record("hit_detection", t)
+    if ball:
+        touching = [(p["x"], p["y"], 25) for p in players.values() if p["alive"]]
+        scored = ball.step(frames, touching)
+        if scored:
+            print(f"Goal in the {scored} goal! Score {ball.goals_scored}")
+    for p_id, p in players.items():
+        spawn_service.track(p_id, p["x"], p["y"], p["alive"])
+    t = stats.record("ball_and_spawns", t)
+    publish_snapshot(current_time)
+    stats.record("snapshot", t)
+    stats.record("tick", tick_start)
+
+def game_tick():
+    interval = 1.0 / TICK_RATE
+    frames = 60.0 / TICK_RATE  # game speeds are tuned in 60fps frames
+    next_time = time.time()
     while True:
-        x = random.randint(100, 1820)
-        y = random.randint(100, 980)
-        if not is_colliding_with_walls(x, y, 25): # Player radius is 25
-            return x, y
+        # This is the only thread that moves the world: a bug in one tick
+        # is logged and the next tick runs, rather than every client
+        # silently getting the same frozen snapshot forever
+        try:
+            run_tick(frames)
+        except Exception:
+            print("Simulation tick failed:")
+            traceback.print_exc()
+        next_time += interval
+        time.sleep(max(0, next_time - time.time()))
+
+def get_safe_spawn(p_id):
+    # Brawl Ball teams start on their own half
+    side = team_side(p_id) if GAME_MODE == "BrawlBall" else None
+    return spawn_service.spawn(side)
 
 def threaded_client(conn, p_id):
-    global players
-    
     # Initial safe spawn
-    start_pos_x, start_pos_y = get_safe_spawn()
+    start_pos_x, start_pos_y = get_safe_spawn(p_id)
     
     # 0=x, 1=y, 2=color, 3=is_alive, 4=health, 5=player_id, 6=angle
-    players[p_id] = {
+    me = {
         "x": start_pos_x,
         "y": start_pos_y,
         "color": (random.randint(0,255), random.randint(0,255), random.randint(0,255)),
@@ -75,105 +454,149 @@ def threaded_client(conn, p_id):
         "projectiles": [] 
     }
     
-    conn.send(pickle.dumps(players[p_id]))
-    
-    last_update_time = time.time()
-    
-    while True:
-        try:
-            current_time = time.time()
-            dt = current_time - last_update_time
-            last_update_time = current_time
-            
-            data = pickle.loads(conn.recv(2048*4))
+    conn_stats = stats.connect(p_id, conn.getpeername())
+    # The client answers every world state with its next update, so the gap
+    # between our send and its reply is one round trip (plus a client frame)
+    sent_at = None
+    # Time of the newest world this client has actually been sent (empty
+    # frames from the scheduler leave it looking at that one), and how old
+    # that world was when our last frame left
+    seen_time = None
+    age = 0.0
+    scheduler = SendScheduler(TICK_RATE) if ADAPTIVE_SEND else None
+    try:
+        send_msg(conn, me)
+        joins.append(me)
+        
+        while True:
+            t = stats.now()
+            raw = recv_frame(conn)
+            if raw is None:
+                print("Disconnected")
+                break
+            t_start = t = stats.record("recv", t)
+            if sent_at is not None:
+                received_at = time.time()
+                sample = received_at - sent_at
+                conn_stats.rtt = sample if not conn_stats.rtt else conn_stats.rtt + RTT_SMOOTHING * (sample - conn_stats.rtt)
+                # The client was drawing the last world we sent it: that was `age`
+                # old when our last frame left, and the answer comes back about one
+                # (smoothed) round trip later
+                view_times[p_id] = received_at - conn_stats.rtt - age
+                if scheduler:
+                    scheduler.on_rtt(conn_stats.rtt, received_at)
+            conn_stats.bytes_in += len(raw)
+            conn_stats.msgs_in += 1
+
+            data = pickle.loads(raw)
+            t = stats.record("unpickle", t)
             
             if not data:
                 print("Disconnected")
                 break
+            try:
+                data = clean_input(data)
+            except ValueError as e:
+                print(f"Bad update from player {p_id}, disconnecting:", e)
+                break
+            
+            # Hand the update to the simulation; it is applied next tick
+            inputs[p_id] = data
+            t = stats.record("post_input", t)
+
+            # Send back the latest world state this player can see
+            snapshot = publisher.latest
+            visible = visible_ids(p_id, snapshot.players)
+            if scheduler:
+                scheduler.max_bandwidth = min(MAX_BANDWIDTH, MAX_EGRESS / max(1, len(snapshot.players)))
+                frame = scheduler.frame(snapshot, p_id, visible, time.time())
+                conn_stats.send_rate = scheduler.rate
+                conn_stats.budget = scheduler.bandwidth
             else:
-                # Update player state from client
-                if players[p_id]["alive"]:
-                    players[p_id]["x"] = data["x"]
-                    players[p_id]["y"] = data["y"]
-                    players[p_id]["angle"] = data.get("angle", 0)
-                    players[p_id]["projectiles"] = data["projectiles"]
-                    
-                    # Authority Hit Reg: Server checks if any projectile hits any OTHER player
-                    for my_proj in players[p_id]["projectiles"][:]:
-                        hit_detected = False
-                        is_super = my_proj.get("is_super", False)
-                        
-                        # Reset super charge if a super was fired
-                        if is_super:
-                            players[p_id]["super_charge"] = 0
-                        
-                        for other_id in players:
-                            if other_id != p_id and players[other_id]["alive"]:
-                                other_p = players[other_id]
-                                dist = ((my_proj["x"] - other_p["x"])**2 + (my_proj["y"] - other_p["y"])**2)**0.5
-                                
-                                # Hitbox check
-                                hit_radius = 40 if is_super else 35
-                                if dist < hit_radius:
-                                    damage = 100 if is_super else 25
-                                    players[other_id]["health"] -= damage
-                                    players[other_id]["last_damage_time"] = current_time
-                                    
-                                    if not is_super:
-                                        hit_detected = True
-                                        # Charge super on normal hits
-                                        players[p_id]["super_charge"] = min(100, players[p_id]["super_charge"] + 25)
-                                    
-                                    if players[other_id]["health"] <= 0:
-                                        players[other_id]["alive"] = False
-                                        players[other_id]["health"] = 0
-                                        dead_players[other_id] = current_time
-                                    
-                                    if not is_super: break # Standard bullet hits one
-                        
-                        if hit_detected:
-                            players[p_id]["projectiles"].remove(my_proj)
-                    
-                    # Process healing for this player
-                    if players[p_id]["health"] < 100:
-                        time_since_hit = current_time - players[p_id]["last_damage_time"]
-                        if time_since_hit > 2.0:
-                            # Accelerating healing: faster the longer you wait
-                            # Slowed down by 2x: (2.5 base + accelerant / 2)
-                            regen_speed = 2.5 + (time_since_hit - 2.0)**2 * 5
-                            players[p_id]["health"] = min(100, players[p_id]["health"] + regen_speed * dt)
-                
-                # Check for respawn
-                if not players[p_id]["alive"]:
-                     if p_id in dead_players:
-                        if current_time - dead_players[p_id] > 5: # 5 seconds
-                            players[p_id]["alive"] = True
-                            players[p_id]["health"] = 100
-                            players[p_id]["super_charge"] = 0
-                            players[p_id]["last_damage_time"] = current_time
-                            safe_x, safe_y = get_safe_spawn()
-                            players[p_id]["x"] = safe_x
-                            players[p_id]["y"] = safe_y
-                            del dead_players[p_id]
-
-                # Send back ALL players data
-                reply = players
-                conn.sendall(pickle.dumps(reply))
-        except:
-            break
-
-    print("Lost connection")
+                frame = snapshot.frame_for(visible)
+            t = stats.record("encode", t)
+            conn_stats.bytes_out += send_encoded(conn, frame)
+            sent_at = time.time()
+            if frame is not EMPTY_FRAME:
+                seen_time = snapshot.time
+            if seen_time is not None:
+                age = sent_at - seen_time
+            t = stats.record("send", t)
+            stats.record("handle_msg", t_start)
+            conn_stats.msgs_out += 1
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        print("Connection error:", e)
+    finally:
+        print("Lost connection")
+        stats.disconnect(p_id)
+        leaves.append(p_id)
+        conn.close()
+
+def spectator_feed(conn):
+    """Push every tick's full world state to a read-only subscriber"""
     try:
-        del players[p_id]
-        if p_id in dead_players:
-            del dead_players[p_id]
-    except:
-        pass
-    conn.close()
+        send_msg(conn, {"spectator": True, "mode": GAME_MODE, "arena": (ARENA_WIDTH, ARENA_HEIGHT),
+                        "tick_rate": TICK_RATE})
+        tick = publisher.latest.tick - 1
+        while True:
+            snapshot = publisher.wait(tick, timeout=1.0)
+            if snapshot.tick == tick:
+                continue
+            tick = snapshot.tick
+            send_encoded(conn, snapshot.frame)
+    except OSError as e:
+        print("Spectator feed closed:", e)
+    finally:
+        spectator_feeds.discard(conn)
+        conn.close()
+
+def spectator_listener():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((server, SPECTATOR_PORT))
+    listener.listen(MAX_SPECTATOR_FEEDS)
+    while True:
+        conn, addr = listener.accept()
+        if len(spectator_feeds) >= MAX_SPECTATOR_FEEDS:
+            print("Refused spectator feed (connect viewers to relay.py):", addr)
+            conn.close()
+            continue
+        print("Spectator feed to:", addr)
+        spectator_feeds.add(conn)
+        start_new_thread(spectator_feed, (conn,))
+
+def replay_recorder(writer):
+    tick = 0
+    interval = 1.0 / writer.tick_rate
+    next_time = time.time()
+    while not writer.closed:
+        snapshot = publisher.latest
+        ball_state = snapshot.ball
+        if ball_state:
+            ball_state = (ball_state["x"], ball_state["y"], ball_state["vel_x"], ball_state["vel_y"])
+        writer.write_tick(tick, time.time(), snapshot.players, ball_state)
+        tick += 1
+        next_time += interval
+        time.sleep(max(0, next_time - time.time()))
+
+if RECORD_REPLAY:
+    replay_writer = ReplayWriter(REPLAY_PATH, REPLAY_TICK_RATE)
+    atexit.register(replay_writer.close)
+    start_new_thread(replay_recorder, (replay_writer,))
+    print("Recording match to", REPLAY_PATH)
+
+stats.start_logging(STATS_LOG_INTERVAL)
+stats.serve(STATS_PORT)
+start_new_thread(game_tick, ())
+start_new_thread(spectator_listener, ())
 
 while True:
     conn, addr = s.accept()
     print("Connected to:", addr)
 
-    start_new_thread(threaded_client, (conn, current_id_counter))
-    current_id_counter += 1
+    p_id = allocate_player_id()
+    if p_id is None:
+        print("Refused connection, no free player ids:", addr)
+        conn.close()
+        continue
+    start_new_thread(threaded_client, (conn, p_id))
@@ -0,0 +1,98 @@
+import argparse
+import math
+import threading
+import pygame
+from src.map import Map
+from src.modes import Knockout, BrawlBall
+from src.sprites import BarSprites
+from src.spectator import SpectatorClient, RELAY_PORT
+
+# Read-only match viewer. Connects to a relay.py (or, for testing, straight
+# to server.py's spectator feed on 5557) and draws the whole arena scaled
+# to the window.
+#
+#   python spectate.py --host 10.0.0.5 --size 1280 720
+
+
+def receive_loop(client, state):
+    while True:
+        try:
+            data = client.receive()
+        except OSError:
+            data = None
+        if data is None:
+            state["ended"] = True
+            return
+        state["world"] = data
+
+
+def draw_world(surface, world, mode, game_map, bars):
+    surface.fill((40, 40, 40))
+    game_map.draw(surface)
+    for wall in getattr(mode, "walls", []):
+        wall.draw(surface)
+    for p in world["players"].values():
+        if not p["alive"]:
+            continue
+        for proj in p.get("projectiles", ()):
+            if proj.get("is_super"):
+                pygame.draw.circle(surface, (0, 200, 255), (int(proj["x"]), int(proj["y"])), 22)
+            else:
+                pygame.draw.circle(surface, (255, 255, 0), (int(proj["x"]), int(proj["y"])), 8)
+        x, y = p["x"], p["y"]
+        body = bars.body(p["color"], 25)
+        surface.blit(body, body.get_rect(center=(int(x), int(y))))
+        angle = p.get("angle", 0)
+        pygame.draw.line(surface, (255, 100, 100), (x, y), (x + math.cos(angle) * 40, y + math.sin(angle) * 40), 3)
+        surface.blit(bars.health(60, 8, max(0, p["health"] / 100.0), border=0), (x - 30, y - 40))
+    mode.apply_server_state(world)
+    mode.draw(surface)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a match through relay.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=RELAY_PORT)
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 720], metavar=("W", "H"))
+    args = parser.parse_args()
+
+    client = SpectatorClient(args.host, args.port)
+    width, height = client.info["arena"]
+    mode = BrawlBall(width, height) if client.info["mode"] == "BrawlBall" else Knockout(width, height)
+
+    pygame.init()
+    screen = pygame.display.set_mode(tuple(args.size))
+    pygame.display.set_caption(f"Spectating {client.info['mode']}")
+    world_surface = pygame.Surface((width, height))
+    font = pygame.font.Font(None, 36)
+    clock = pygame.time.Clock()
+    game_map = Map(width, height)
+    bars = BarSprites()
+
+    state = {"world": None, "ended": False}
+    threading.Thread(target=receive_loop, args=(client, state), daemon=True).start()
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        world = state["world"]
+        if world:
+            draw_world(world_surface, world, mode, game_map, bars)
+            screen.blit(pygame.transform.smoothscale(world_surface, screen.get_size()), (0, 0))
+            alive = sum(1 for p in world["players"].values() if p["alive"])
+            text = f"{alive}/{len(world['players'])} alive" + ("  (stream ended)" if state["ended"] else "")
+        else:
+            screen.fill((0, 0, 0))
+            text = "Waiting for the match..."
+        screen.blit(font.render(text, True, (255, 255, 0)), (10, 10))
+        pygame.display.flip()
+        clock.tick(client.info["tick_rate"])
+
+    client.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Level-of-detail scheduling for enemy AI. Enemies that are close to a
+# player and on screen think every tick; everyone else is split into
+# round-robin buckets and only thinks when their bucket comes up. On top
+# of that a per-tick budget caps how many enemies think at all, so AI cost
+# stays flat no matter how big the horde gets. Movement is not affected:
+# Horde.integrate() still runs for every enemy every tick.
+
+
+class AIScheduler:
+    def __init__(self, buckets=4, budget=256, near_radius=500):
+        self.buckets = buckets
+        self.budget = budget
+        self.near_radius = near_radius
+        self.tick = 0
+        # Rotating start positions so an over-budget group is served fairly
+        self.near_cursor = 0
+        self.far_cursor = 0
+        self.last_count = 0
+
+    def select(self, x, y, alive, viewers, view_rect=None):
+        """Return the indices of the enemies that should think this tick.
+
+        x, y, alive are per-enemy arrays, viewers a list of objects with
+        x, y (the players) and view_rect an optional (left, top, width,
+        height) of what is on screen.
+        """
+        self.tick += 1
+        idx = np.flatnonzero(alive)
+        if len(idx) == 0:
+            self.last_count = 0
+            return idx
+
+        ex = x[idx]
+        ey = y[idx]
+        if viewers:
+            v = np.array([(p.x, p.y) for p in viewers], dtype=float)
+            dx = ex[:, None] - v[:, 0][None, :]
+            dy = ey[:, None] - v[:, 1][None, :]
+            near = ((dx * dx + dy * dy).min(axis=1)) < self.near_radius * self.near_radius
+        else:
+            near = np.zeros(len(idx), dtype=bool)
+
+        if view_rect is not None:
+            left, top, width, height = view_rect
+            near &= (ex >= left) & (ex <= left + width) & (ey >= top) & (ey <= top + height)
+
+        near_idx = idx[near]
+        far_idx = idx[~near]
+        # Far enemies think when their bucket comes up
+        far_idx = far_idx[(far_idx % self.buckets) == (self.tick % self.buckets)]
+
+        if self.budget is None:
+            chosen = np.concatenate((near_idx, far_idx))
+        else:
+            near_idx, self.near_cursor = self._take(near_idx, self.budget, self.near_cursor)
+            far_idx, self.far_cursor = self._take(far_idx, self.budget - len(near_idx), self.far_cursor)
+            chosen = np.concatenate((near_idx, far_idx))
+
+        self.last_count = len(chosen)
+        return chosen
+
+    def _take(self, group, limit, cursor):
+        """Take up to `limit` entries from group, starting at a rotating cursor"""
+        if limit <= 0 or len(group) == 0:
+            return group[:0], cursor
+        if len(group) <= limit:
+            return group, cursor
+        start = cursor % len(group)
+        picked = np.roll(group, -start)[:limit]
+        return picked, start + limit
@@ -1,16 +1,13 @@
 import pygame
-import random
+from src.state import AmmoState
 
-class Ammo:
-    def __init__(self, x, y, amount=2):
-        self.x = x
-        self.y = y
-        self.amount = amount
-        self.radius = 8
-        self.rect = pygame.Rect(x - self.radius, y - self.radius, self.radius * 2, self.radius * 2)
-    
-    def update(self):
-        self.rect = pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
+class Ammo(AmmoState):
+    """Renderable ammo pickup. State lives in AmmoState."""
+    __slots__ = ()
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.bounds())
     
     def draw(self, surface):
         # Draw ammo pickup as a yellow square with glow
@@ -0,0 +1,143 @@
+import math
+from src.physics import sweep_circle_circle, sweep_circle_aabb, segment_aabb, reflect
+
+# Server-side Brawl Ball simulation. Same rules as the old client-side
+# BrawlBall.update (friction, 0.8 bounce off the arena edges, kicked away
+# from whoever touches it, goal when the ball centre enters a goal zone)
+# but every step sweeps the ball along its whole path, so it can't skip
+# over players, walls or goal zones when the server ticks slowly.
+
+MAX_EVENTS_PER_STEP = 8
+
+# Teams: even player ids start on the left half and defend the left goal,
+# odd ones the right
+TEAM_SIDES = ("left", "right")
+
+
+def team_side(player_id):
+    return TEAM_SIDES[player_id % 2]
+
+
+class BallPhysics:
+    def __init__(self, width, height, walls=(), radius=10):
+        self.width = width
+        self.height = height
+        self.walls = [tuple(w) for w in walls]
+        self.radius = radius
+        self.friction = 0.95  # per 60fps frame
+        self.restitution = 0.8
+        self.kick_speed = 8
+        # Goal zones (x, y, w, h), named after the side they are on
+        self.goals = {
+            "left": (0, 100, 50, height - 200),
+            "right": (width - 50, 100, 50, height - 200),
+        }
+        self.goals_scored = {"left": 0, "right": 0}
+        self.reset()
+
+    def reset(self):
+        self.x = self.width / 2
+        self.y = self.height / 2
+        self.vel_x = 0.0
+        self.vel_y = 0.0
+
+    def _kick_from(self, px, py):
+        dx = self.x - px
+        dy = self.y - py
+        dist = math.sqrt(dx * dx + dy * dy)
+        if dist > 0:
+            self.vel_x = dx / dist * self.kick_speed
+            self.vel_y = dy / dist * self.kick_speed
+
+    def step(self, frames, players):
+        """Advance by `frames` 60fps frames (2.0 at a 30Hz tick).
+
+        players is an iterable of (x, y, radius). Returns the goal side
+        ("left"/"right") if a goal was scored this step, else None.
+        """
+        decay = self.friction ** frames
+        self.vel_x *= decay
+        self.vel_y *= decay
+
+        # Anyone already touching the ball kicks it
+        for px, py, pr in players:
+            reach = pr + self.radius
+            if (self.x - px)**2 + (self.y - py)**2 < reach * reach:
+                self._kick_from(px, py)
+
+        r = self.radius
+        bounds = (r, r, self.width - r, self.height - r)
+        remaining = frames
+        for _ in range(MAX_EVENTS_PER_STEP):
+            if remaining <= 0:
+                break
+            x0, y0 = self.x, self.y
+            x1 = x0 + self.vel_x * remaining
+            y1 = y0 + self.vel_y * remaining
+            if x0 == x1 and y0 == y1:
+                break
+
+            # Find the earliest thing the ball runs into on this path
+            first_t = None
+            event = None
+            for px, py, pr in players:
+                t = sweep_circle_circle(x0, y0, x1, y1, r, px, py, pr)
+                if t is not None and t > 0 and (first_t is None or t < first_t):
+                    first_t, event = t, ("kick", px, py)
+            for wall in self.walls:
+                hit = sweep_circle_aabb(x0, y0, x1, y1, r, wall)
+                if hit is not None and hit[0] > 0 and (first_t is None or hit[0] < first_t):
+                    first_t, event = hit[0], ("bounce", hit[1], hit[2])
+            for side, zone in self.goals.items():
+                t = segment_aabb(x0, y0, x1, y1, zone)
+                if t is not None and (first_t is None or t < first_t):
+                    first_t, event = t, ("goal", side)
+            # Arena edges
+            for t, nx, ny in self._edge_hits(x0, y0, x1, y1, bounds):
+                if first_t is None or t < first_t:
+                    first_t, event = t, ("bounce", nx, ny)
+
+            if event is None:
+                self.x, self.y = x1, y1
+                break
+
+            self.x = x0 + (x1 - x0) * first_t
+            self.y = y0 + (y1 - y0) * first_t
+            remaining *= (1 - first_t)
+            if event[0] == "goal":
+                self.goals_scored[event[1]] += 1
+                self.reset()
+                return event[1]
+            if event[0] == "kick":
+                self._kick_from(event[1], event[2])
+            else:
+                self.vel_x, self.vel_y = reflect(self.vel_x, self.vel_y, event[1], event[2], self.restitution)
+
+        # Safety clamp in case we ran out of events mid-step
+        self.x = max(bounds[0], min(self.x, bounds[2]))
+        self.y = max(bounds[1], min(self.y, bounds[3]))
+        return None
+
+    def _edge_hits(self, x0, y0, x1, y1, bounds):
+        left, top, right, bottom = bounds
+        dx = x1 - x0
+        dy = y1 - y0
+        if dx < 0 and x1 < left:
+            yield max(0.0, (left - x0) / dx), 1.0, 0.0
+        if dx > 0 and x1 > right:
+            yield max(0.0, (right - x0) / dx), -1.0, 0.0
+        if dy < 0 and y1 < top:
+            yield max(0.0, (top - y0) / dy), 0.0, 1.0
+        if dy > 0 and y1 > bottom:
+            yield max(0.0, (bottom - y0) / dy), 0.0, -1.0
+
+    def state(self):
+        """What clients need to draw the ball and the score"""
+        return {
+            "x": self.x,
+            "y": self.y,
+            "vel_x": self.vel_x,
+            "vel_y": self.vel_y,
+            "goals_left": self.goals_scored["left"],
+            "goals_right": self.goals_scored["right"],
+        }
@@ -0,0 +1,153 @@
+import math
+import time
+from types import SimpleNamespace
+from src.player import Player
+from src.enemy import Enemy
+from src.projectile import Projectile
+from src.modes import Knockout
+from src.network import Network, merge_world
+from src.physics import sweep_circle_aabb
+
+
+class Bot:
+    """Headless client that plays through the real network protocol.
+
+    Movement, ammo and shooting come from Player, decisions (strafing,
+    dodging, fire cadence) from the Enemy AI, so bot traffic looks like a
+    real client's: same payload shape, same projectile lifetimes.
+    """
+    def __init__(self, server_ip="127.0.0.1", world_width=1920, world_height=1080, port=5555):
+        self.world_width = world_width
+        self.world_height = world_height
+
+        self.net = Network(server_ip, port)
+        start_data = self.net.getP()
+        if start_data is None:
+            raise ConnectionError(f"Could not connect to {server_ip}:{self.net.port}")
+
+        self.player_id = start_data["id"]
+        self.player = Player(start_data["x"], start_data["y"], 25, start_data["color"])
+
+        # The Enemy is only used as a "brain": it decides velocity and when
+        # to fire, the Player then does the actual moving and shooting
+        self.brain = Enemy(start_data["x"], start_data["y"], 25, start_data["color"])
+        self.brain.speed = self.player.speed
+
+        self.walls = Knockout(world_width, world_height).walls
+        self.projectiles = []
+        self.other_players = {}
+        self.connected = True
+        self.last_rtt = 0.0
+
+    def _threats(self):
+        threats = []
+        for p_id, p_data in self.other_players.items():
+            if p_id == self.player_id:
+                continue
+            for proj in p_data.get("projectiles", []):
+                threats.append(Projectile(proj["x"], proj["y"], proj.get("vel_x", 0), proj.get("vel_y", 0), id=proj["id"]))
+        return threats
+
+    def _nearest_target(self):
+        best = None
+        best_dist = None
+        for p_id, p_data in self.other_players.items():
+            if p_id == self.player_id or not p_data["alive"]:
+                continue
+            dist = (p_data["x"] - self.player.x)**2 + (p_data["y"] - self.player.y)**2
+            if best_dist is None or dist < best_dist:
+                best = p_data
+                best_dist = dist
+        return best
+
+    def think(self):
+        """Run one frame of AI and local simulation (no network)"""
+        player = self.player
+        alive = player.health > 0
+
+        if alive:
+            self.brain.x = player.x
+            self.brain.y = player.y
+            self.brain.update(self.world_width, self.world_height, self._threats())
+            player.vel_x = self.brain.vel_x
+            player.vel_y = self.brain.vel_y
+
+            target = self._nearest_target()
+            if target:
+                player.mouse_angle = math.atan2(target["y"] - player.y, target["x"] - player.x)
+                # Enemy cadence decides when to pull the trigger
+                if self.brain.shoot_at(SimpleNamespace(x=target["x"], y=target["y"])):
+                    projectile = player.shoot()
+                    if projectile:
+                        self.projectiles.append(projectile)
+                if player.super_meter >= player.super_max:
+                    projectile = player.fire_super()
+                    if projectile:
+                        self.projectiles.append(projectile)
+        else:
+            player.vel_x = 0
+            player.vel_y = 0
+
+        player.update(self.world_width, self.world_height)
+
+        for projectile in self.projectiles[:]:
+            prev_x, prev_y = projectile.x, projectile.y
+            projectile.update()
+            if projectile.is_off_screen(self.world_width, self.world_height):
+                self.projectiles.remove(projectile)
+                continue
+            for wall in self.walls:
+                if sweep_circle_aabb(prev_x, prev_y, projectile.x, projectile.y, projectile.radius,
+                                     (wall.x, wall.y, wall.width, wall.height)) is not None:
+                    self.projectiles.remove(projectile)
+                    break
+
+        for wall in self.walls:
+            if wall.collides_with_point(player.x, player.y, player.radius):
+                player.x, player.y = wall.get_collision_response(player.x, player.y, player.radius)
+
+    def payload(self):
+        return {
+            "x": self.player.x,
+            "y": self.player.y,
+            "angle": self.player.mouse_angle,
+            "projectiles": [{"x": p.x, "y": p.y, "vel_x": p.vel_x, "vel_y": p.vel_y, "id": p.id, "is_super": p.is_super} for p in self.projectiles]
+        }
+
+    def apply_server_state(self, server_data):
+        """Same authority sync Game.update does with the server reply"""
+        self.other_players = merge_world(self.other_players, server_data)
+        my_data = server_data["players"].get(self.player_id)
+        if not my_data:
+            return
+        self.player.health = my_data["health"]
+        self.player.super_meter = my_data.get("super_charge", 0)
+        spent = my_data.get("spent")
+        if spent:
+            spent = set(spent)
+            self.projectiles = [p for p in self.projectiles if p.id not in spent]
+        if my_data["alive"]:
+            dist = ((self.player.x - my_data["x"])**2 + (self.player.y - my_data["y"])**2)**0.5
+            if dist > 300: # Respawned
+                self.player.x = my_data["x"]
+                self.player.y = my_data["y"]
+                self.projectiles = []
+
+    def step(self):
+        """Think, send one update and apply the reply. Returns the reply or None if the connection dropped."""
+        self.think()
+        sent_at = time.perf_counter()
+        server_data = self.net.send(self.payload())
+        self.last_rtt = time.perf_counter() - sent_at
+        if server_data is None:
+            self.connected = False
+            return None
+        self.apply_server_state(server_data)
+        return server_data
+
+    def close(self):
+        self.connected = False
+        try:
+            self.net.client.close()
+        except OSError:
+            pass
@@ -0,0 +1,75 @@
+import pygame
+from src.sprites import LRUCache
+
+# Scrolling view over a world that can be bigger than the screen. The
+# camera follows the local player and stays inside the world; everything
+# in world coordinates is drawn at (x - camera.x, y - camera.y).
+
+
+class Camera:
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y):
+        """Centre on (x, y) without showing anything past the world edges"""
+        self.x = int(max(0, min(x - self.view_width / 2, self.world_width - self.view_width)))
+        self.y = int(max(0, min(y - self.view_height / 2, self.world_height - self.view_height)))
+
+    @property
+    def offset(self):
+        """Add to world coordinates to get view coordinates"""
+        return -self.x, -self.y
+
+    @property
+    def rect(self):
+        return self.x, self.y, self.view_width, self.view_height
+
+    def to_world(self, view_x, view_y):
+        return view_x + self.x, view_y + self.y
+
+    def is_visible(self, x, y, margin=0):
+        return (self.x - margin <= x <= self.x + self.view_width + margin
+                and self.y - margin <= y <= self.y + self.view_height + margin)
+
+
+class ChunkedBackground:
+    """Static background rendered lazily in chunk_size squares.
+
+    render(surface, x, y) must draw the part of the world whose top-left
+    corner is (x, y) onto surface. Only chunks the camera overlaps are
+    built or blitted, and the least recently seen ones are dropped, so
+    memory and draw cost follow the view size, not the world size.
+    """
+    def __init__(self, world_width, world_height, render, chunk_size=512, cache_size=32):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.render = render
+        self.chunk_size = chunk_size
+        self.chunks = LRUCache(cache_size)
+
+    def _build(self, col, row):
+        x = col * self.chunk_size
+        y = row * self.chunk_size
+        w = min(self.chunk_size, self.world_width - x)
+        h = min(self.chunk_size, self.world_height - y)
+        surface = pygame.Surface((w, h)).convert()
+        self.render(surface, x, y)
+        return surface
+
+    def draw(self, target, camera):
+        cs = self.chunk_size
+        col0 = max(0, camera.x // cs)
+        row0 = max(0, camera.y // cs)
+        col1 = min((self.world_width - 1) // cs, (camera.x + camera.view_width - 1) // cs)
+        row1 = min((self.world_height - 1) // cs, (camera.y + camera.view_height - 1) // cs)
+        blits = []
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                chunk = self.chunks.get((col, row), lambda: self._build(col, row))
+                blits.append((chunk, (col * cs - camera.x, row * cs - camera.y)))
+        target.blits(blits, doreturn=False)
@@ -0,0 +1,182 @@
+import csv
+import json
+import time
+from collections import deque
+import pygame
+
+# Stages in the order Game.run goes through them. Anything marked with a
+# name not listed here still gets timed, it just shows up at the end.
+STAGES = ["input", "simulation", "network", "map", "entities", "hud", "scale_blit", "overlay", "flip", "idle"]
+
+STAGE_COLORS = {
+    "input": (200, 200, 200),
+    "simulation": (80, 200, 80),
+    "network": (80, 140, 255),
+    "map": (150, 100, 50),
+    "entities": (255, 200, 0),
+    "hud": (255, 120, 200),
+    "scale_blit": (0, 220, 220),
+    "overlay": (120, 120, 120),
+    "flip": (255, 80, 80),
+    "idle": (60, 60, 60),
+}
+
+
+class FrameTrace:
+    """Writes one row per frame to a .csv or .json (JSON lines) file.
+
+    The columns are the stages known when the trace starts; time in stages
+    first marked later goes in "other_ms".
+    """
+    def __init__(self, path, stages):
+        self.path = path
+        self.stages = list(stages)
+        self.file = open(path, "w", newline="")
+        self.is_csv = path.endswith(".csv")
+        if self.is_csv:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(["frame", "time", "total_ms", "spike"] + [s + "_ms" for s in self.stages] + ["other_ms"])
+
+    def write(self, frame, timestamp, total, spike, timings):
+        other = sum(t for s, t in timings.items() if s not in self.stages)
+        if self.is_csv:
+            self.writer.writerow([frame, f"{timestamp:.4f}", f"{total * 1000:.3f}", int(spike)]
+                                 + [f"{timings.get(s, 0.0) * 1000:.3f}" for s in self.stages]
+                                 + [f"{other * 1000:.3f}"])
+        else:
+            row = {"frame": frame, "time": round(timestamp, 4), "total_ms": round(total * 1000, 3), "spike": spike}
+            row.update({s: round(timings.get(s, 0.0) * 1000, 3) for s in self.stages})
+            row["other"] = round(other * 1000, 3)
+            self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class FrameProfiler:
+    """Per-frame stage timer with a rolling history and an optional overlay.
+
+    Call begin_frame() once per frame, mark(stage) after each stage (the
+    time since the previous mark is charged to that stage; repeated marks
+    of the same stage within a frame add up) and end_frame() at the end.
+    """
+    def __init__(self, target_fps=60, history=240, spike_factor=2.0):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+        self.spike_factor = spike_factor
+        self.stages = list(STAGES)
+        self.history = deque(maxlen=history)
+        self.totals = deque(maxlen=history)
+        self.spikes = deque(maxlen=history)
+        self.frame = 0
+        self.timings = {}
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.enabled = False
+        self.trace = None
+        self.font = None
+
+    def begin_frame(self):
+        self.timings = {}
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self.last_mark)
+        self.last_mark = now
+        if stage not in self.stages:
+            self.stages.append(stage)
+
+    def end_frame(self):
+        total = time.perf_counter() - self.frame_start
+        # A spike is a frame well over both the rolling average and the
+        # frame budget, so a steady 30fps machine isn't flagged every frame
+        avg = (sum(self.totals) / len(self.totals)) if self.totals else total
+        spike = total > self.budget and total > avg * self.spike_factor
+
+        self.history.append(self.timings)
+        self.totals.append(total)
+        self.spikes.append(spike)
+        if self.trace:
+            self.trace.write(self.frame, time.time(), total, spike, self.timings)
+        self.frame += 1
+
+    def toggle_overlay(self):
+        self.enabled = not self.enabled
+
+    def toggle_trace(self, path=None):
+        """Start writing a trace (CSV if path ends in .csv, else JSON lines) or stop the current one"""
+        if self.trace:
+            self.trace.close()
+            print(f"Frame trace saved to {self.trace.path}")
+            self.trace = None
+        else:
+            path = path or time.strftime("frames_%Y%m%d_%H%M%S.csv")
+            self.trace = FrameTrace(path, self.stages)
+            print(f"Recording frame trace to {path}")
+
+    def close(self):
+        if self.trace:
+            self.trace.close()
+            self.trace = None
+
+    def averages(self, frames=60):
+        recent = list(self.history)[-frames:]
+        if not recent:
+            return {}
+        return {s: sum(t.get(s, 0.0) for t in recent) / len(recent) for s in self.stages}
+
+    def draw(self, surface, x=10, y=None):
+        """Draw the stage table and a stacked frame-time graph"""
+        if not self.enabled or not self.totals:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+
+        graph_w = 2 * self.history.maxlen
+        graph_h = 100
+        line_h = 16
+        panel_h = graph_h + 30 + line_h * (len(self.stages) + 1)
+        if y is None:
+            y = surface.get_height() - panel_h - 10
+
+        panel = pygame.Surface((graph_w + 20, panel_h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        surface.blit(panel, (x - 10, y - 5))
+
+        # Stacked bar per frame, scaled so 2x the frame budget fills the graph
+        scale = graph_h / (self.budget * 2)
+        base_y = y + graph_h
+        for i, timings in enumerate(self.history):
+            bx = x + i * 2
+            by = base_y
+            for stage in self.stages:
+                h = timings.get(stage, 0.0) * scale
+                if h <= 0:
+                    continue
+                h = min(h, by - y)
+                pygame.draw.line(surface, STAGE_COLORS.get(stage, (255, 255, 255)), (bx, by), (bx, by - h), 2)
+                by -= h
+            if self.spikes[i]:
+                pygame.draw.line(surface, (255, 0, 0), (bx, y), (bx, y + 6), 2)
+
+        # Frame budget line
+        budget_y = base_y - self.budget * scale
+        pygame.draw.line(surface, (255, 255, 255), (x, budget_y), (x + graph_w, budget_y), 1)
+
+        # Rolling averages per stage
+        avgs = self.averages()
+        recent = list(self.totals)[-60:]
+        avg_total = sum(recent) / len(recent)
+        spike_count = sum(self.spikes)
+        ty = base_y + 10
+        header = f"frame {avg_total * 1000:.2f} ms avg ({1.0 / avg_total if avg_total else 0:.0f} fps)  spikes: {spike_count}"
+        surface.blit(self.font.render(header, True, (255, 255, 255)), (x, ty))
+        if self.trace:
+            surface.blit(self.font.render("REC", True, (255, 0, 0)), (x + graph_w - 30, ty))
+        for stage in self.stages:
+            ty += line_h
+            color = STAGE_COLORS.get(stage, (255, 255, 255))
+            pygame.draw.rect(surface, color, (x, ty + 3, 10, 10))
+            text = f"{stage:<11} {avgs.get(stage, 0.0) * 1000:6.2f} ms"
+            surface.blit(self.font.render(text, True, (230, 230, 230)), (x + 16, ty))
@@ -3,13 +3,29 @@ from src.player import Player
 from src.enemy import Enemy
 from src.projectile import Projectile
 from src.map import Map
-from src.modes import Knockout, BrawlBall
-from src.network import Network
+from src.modes import Knockout, BrawlBall, Survival
+from src.network import Network, merge_world
+from src.ball import team_side
+from src.frame_profiler import FrameProfiler
+from src.sprites import SpriteLayer, SpriteBatch, BarSprites
+from src.camera import Camera, ChunkedBackground
+from src.spatial import SpatialGrid
+from src.physics import sweep_circle_aabb
 import random
 import math
 
+# The simulation always steps at 60 Hz: speeds, cooldowns and reload times
+# are all counted in 60fps frames. Rendering runs at whatever rate the
+# machine manages (capped by fps) and interpolates between the last two
+# steps, so the game runs at the same speed on a 144 Hz monitor and on a
+# laptop that only draws 40 frames a second.
+SIM_RATE = 60
+# Steps one frame may catch up on; past that a stall is dropped instead of
+# replayed, so a slow frame can't snowball into slower ones
+MAX_STEPS = 5
+
 class Game:
-    def __init__(self, width, height, fps, mode_name="Knockout", server_ip="127.0.0.1"):
+    def __init__(self, width, height, fps, mode_name="Knockout", server_ip="127.0.0.1", world_size=(1920, 1080), server_port=5555):
         self.width = width
         self.height = height
         self.fps = fps
@@ -22,13 +38,16 @@ class Game:
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Brawl Stars Clone")
         
-        # Virtual resolution (Standard world size)
-        self.WORLD_WIDTH = 1920
-        self.WORLD_HEIGHT = 1080
-        self.virtual_screen = pygame.Surface((self.WORLD_WIDTH, self.WORLD_HEIGHT))
+        # Virtual resolution: we always render a 1920x1080 view and scale it to
+        # the window. The world can be bigger; the camera scrolls over it.
+        self.VIEW_WIDTH = 1920
+        self.VIEW_HEIGHT = 1080
+        self.WORLD_WIDTH, self.WORLD_HEIGHT = world_size
+        self.virtual_screen = pygame.Surface((self.VIEW_WIDTH, self.VIEW_HEIGHT))
+        self.camera = Camera(self.VIEW_WIDTH, self.VIEW_HEIGHT, self.WORLD_WIDTH, self.WORLD_HEIGHT)
         
         # Networking
-        self.net = Network(server_ip)
+        self.net = Network(server_ip, server_port)
         start_data = self.net.getP() # Receive initial pos/id
         
         # Game state
@@ -48,14 +67,57 @@ class Game:
         
         self.projectiles = []
         
+        # Positions before the latest simulation step, for interpolation
+        self.previous_position = (self.player.x, self.player.y)
+        self.previous_projectiles = {}
+        
         # Game mode
         if mode_name == "BrawlBall":
-            self.mode = BrawlBall(self.WORLD_WIDTH, self.WORLD_HEIGHT)
+            self.mode = BrawlBall(self.WORLD_WIDTH, self.WORLD_HEIGHT, team_side(self.player_id))
+        elif mode_name == "Survival":
+            self.mode = Survival(self.WORLD_WIDTH, self.WORLD_HEIGHT)
         else:
             self.mode = Knockout(self.WORLD_WIDTH, self.WORLD_HEIGHT)
+        self.mode.camera = self.camera
         
         self.game_over = False
         self.winner = None
+        
+        # Frame-time profiler (F3 = overlay, F4 = start/stop trace file)
+        self.profiler = FrameProfiler(fps)
+        
+        # Sprite atlas (build_atlas.py). Without it everything is drawn with
+        # primitives like before.
+        self.sprites = SpriteLayer.load()
+        if self.sprites:
+            for wall in getattr(self.mode, "walls", []):
+                wall.texture = self.sprites.tiled("wall", wall.width, wall.height)
+            if hasattr(self.mode, "horde"):
+                self.mode.horde.sprite = self.sprites.sprite("enemy")
+        else:
+            print("No sprite atlas found, run build_atlas.py for textured graphics")
+        # Bodies and bars rendered once per colour / fill level, blitted in one batch
+        self.bars = BarSprites()
+        self.batch = SpriteBatch()
+        
+        # The floor and map never change: render them once per 512px chunk,
+        # and only the chunks the camera looks at
+        self.background = ChunkedBackground(self.WORLD_WIDTH, self.WORLD_HEIGHT, self.render_background)
+        
+        # Culling: walls are indexed once, players and projectiles every frame
+        self.wall_index = SpatialGrid()
+        for wall in getattr(self.mode, "walls", []):
+            self.wall_index.insert(wall, wall.x, wall.y, wall.width, wall.height)
+        self.entity_index = SpatialGrid()
+    
+    def render_background(self, surface, x, y):
+        """Draw the world's floor and map with (x, y) at the surface's top-left"""
+        surface.fill((40, 40, 40))
+        if self.sprites:
+            # Chunks are a multiple of the tile size, so tiles line up across chunks
+            ground = self.sprites.tiled("ground", self.background.chunk_size, self.background.chunk_size, tint=(90, 90, 90))
+            surface.blit(ground, (0, 0))
+        self.map.draw(surface, offset=(-x, -y))
     
     # (Ammo and health pickups removed)
         
@@ -66,6 +128,10 @@ class Game:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                elif event.key == pygame.K_F4:
+                    self.profiler.toggle_trace()
             # Mouse click to shoot
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left mouse button
@@ -77,10 +143,10 @@ class Game:
                     if projectile:
                         self.projectiles.append(projectile)
         
-        # Scale mouse coordinates for the virtual world
+        # Scale mouse coordinates to the view, then into the world
         mx, my = pygame.mouse.get_pos()
-        scaled_mx = mx * (self.WORLD_WIDTH / self.screen_width)
-        scaled_my = my * (self.WORLD_HEIGHT / self.screen_height)
+        scaled_mx, scaled_my = self.camera.to_world(mx * (self.VIEW_WIDTH / self.screen_width),
+                                                    my * (self.VIEW_HEIGHT / self.screen_height))
         
         # Player movement
         keys = pygame.key.get_pressed()
@@ -92,6 +158,7 @@ class Game:
             walls = self.mode.walls
     
     def update(self):
+        """One fixed simulation step (1/SIM_RATE s)"""
         if self.game_over:
             return
         
@@ -99,20 +166,41 @@ class Game:
         if hasattr(self.mode, 'walls'):
             walls = self.mode.walls
         
+        self.previous_position = (self.player.x, self.player.y)
+        self.previous_projectiles = {p.id: (p.x, p.y) for p in self.projectiles}
+        
         # Update LOCAL player
         self.player.update(self.WORLD_WIDTH, self.WORLD_HEIGHT)
         
         # Update LOCAL projectiles
         for projectile in self.projectiles[:]:
+            prev_x, prev_y = projectile.x, projectile.y
             projectile.update()
             if projectile.is_off_screen(self.WORLD_WIDTH, self.WORLD_HEIGHT):
                 self.projectiles.remove(projectile)
                 continue
-             # Check wall collisions
+            # Check wall collisions along the whole step (no tunnelling through thin walls)
             for wall in walls:
-                if wall.collides_with_point(projectile.x, projectile.y, projectile.radius):
+                if sweep_circle_aabb(prev_x, prev_y, projectile.x, projectile.y, projectile.radius,
+                                     (wall.x, wall.y, wall.width, wall.height)) is not None:
                     self.projectiles.remove(projectile)
                     break
+        
+        # Mode-specific simulation (ball, PvE enemies)
+        self.mode.update(self.player, [], self.projectiles)
+        
+        # Check player-wall collisions
+        for wall in walls:
+            if wall.collides_with_point(self.player.x, self.player.y, self.player.radius):
+                self.player.x, self.player.y = wall.get_collision_response(self.player.x, self.player.y, self.player.radius)
+    
+    def sync(self):
+        """Send our state to the server and apply the world it answers with.
+        Once per rendered frame that stepped the simulation, not once per
+        step: a frame catching up on several steps would otherwise wait for
+        several round trips."""
+        if self.game_over:
+            return
 
         # Prepare data to send
         data_to_send = {
@@ -124,19 +212,28 @@ class Game:
         
         # Send to server and receive World State
         server_data = self.net.send(data_to_send)
+        self.profiler.mark("network")
         if server_data:
-            self.other_players = server_data # This is the dict of all players
+            # Updates can be partial; keep the last known state of everyone else
+            self.other_players = merge_world(self.other_players, server_data)
+            self.mode.apply_server_state(server_data)
             
-            # Update local player health/status from server authority
-            if self.player_id in self.other_players:
-                my_data = self.other_players[self.player_id]
-                self.player.health = my_data["health"]
+            # Update local player health/status from server authority (only
+            # when this update carries it, so nothing stale is re-applied)
+            my_data = server_data["players"].get(self.player_id)
+            if my_data:
+                if not self.mode.pve:
+                    self.player.health = my_data["health"]
                 self.player.super_meter = my_data.get("super_charge", 0)
                 
-                # Authority Sync: If the server removed a projectile (because it hit something),
-                # we must remove it locally too so it disappears.
-                server_proj_ids = [p["id"] for p in my_data["projectiles"]]
-                self.projectiles = [p for p in self.projectiles if p.id in server_proj_ids]
+                # Authority Sync: If the server used up a projectile (because it hit something),
+                # we must remove it locally too so it disappears. The snapshot can be
+                # up to a tick old, so go by what the server spent rather than by what
+                # it has seen (projectiles fired since then are missing from it).
+                spent = my_data.get("spent")
+                if spent:
+                    spent = set(spent)
+                    self.projectiles = [p for p in self.projectiles if p.id not in spent]
                 
                 # Handling respawn logic on client side visual
                 if not my_data["alive"]:
@@ -151,73 +248,128 @@ class Game:
                     if dist > 300: # Respawned
                         self.player.x = my_data["x"]
                         self.player.y = my_data["y"]
+                        self.previous_position = (self.player.x, self.player.y) # Don't slide there
                         self.projectiles = [] # Clear projectiles on respawn
+    
+    def draw(self, alpha=1.0):
+        """alpha is how far (0-1) the current time is between the previous
+        simulation step and the latest one"""
+        # Local player and projectiles are drawn between their last two steps
+        prev_x, prev_y = self.previous_position
+        player_x = prev_x + (self.player.x - prev_x) * alpha
+        player_y = prev_y + (self.player.y - prev_y) * alpha
         
-        # Check player-wall collisions
-        for wall in walls:
-            if wall.collides_with_point(self.player.x, self.player.y, self.player.radius):
-                self.player.x, self.player.y = wall.get_collision_response(self.player.x, self.player.y, self.player.radius)
+        camera = self.camera
+        camera.follow(player_x, player_y)
+        offset = camera.offset
+        ox, oy = offset
         
-        # Update player rect
-        self.player.rect = pygame.Rect(self.player.x - self.player.radius, self.player.y - self.player.radius, 
-                                       self.player.radius * 2, self.player.radius * 2)
+        # Floor and map (pre-rendered chunks under the view)
+        self.background.draw(self.virtual_screen, camera)
+        self.profiler.mark("map")
+        
+        # Only what is in (or near) the view gets drawn
+        view_x, view_y, view_w, view_h = camera.rect
+        margin = 60  # bodies, bars and super glows reach past the centre point
+        index = self.entity_index
+        index.clear()
+        for p_id, p_data in self.other_players.items():
+            if p_data["alive"] and p_id != self.player_id:
+                index.insert(("player", p_data), p_data["x"], p_data["y"])
+                for proj in p_data.get("projectiles", ()):
+                    index.insert(("projectile", proj), proj["x"], proj["y"])
+        visible = index.query(view_x - margin, view_y - margin, view_w + 2 * margin, view_h + 2 * margin)
+        
+        for wall in self.wall_index.query(view_x, view_y, view_w, view_h):
+            wall.draw(self.virtual_screen, offset)
+        
+        # Bodies, projectiles and health bars are pre-rendered and queued, then
+        # blitted in one batch; only the aim lines are drawn as primitives
+        sprites = self.sprites
+        batch = self.batch
+        aim_lines = []
+        for kind, data in visible:
+            x = data["x"] + ox
+            y = data["y"] + oy
+            if kind == "projectile":
+                is_super = data.get("is_super", False)
+                if sprites:
+                    batch.queue(sprites.sprite("super" if is_super else "bullet"), x, y)
+                elif not is_super:
+                    pygame.draw.circle(self.virtual_screen, (255, 255, 0), (int(x), int(y)), 8)
+                else:
+                    # Simple remote super draw (energy ball)
+                    r = 22
+                    pygame.draw.circle(self.virtual_screen, (0, 200, 255), (int(x), int(y)), r)
+                    pygame.draw.circle(self.virtual_screen, (200, 240, 255), (int(x), int(y)), int(r*0.6))
+                continue
             
-    
-    def draw(self):
-        # Clear virtual screen
-        self.virtual_screen.fill((40, 40, 40))
+            if sprites:
+                batch.queue(sprites.body("player", data["color"], 25), x, y)
+            else:
+                batch.queue(self.bars.body(data["color"], 25), x, y)
+            
+            # Draw remote player aim indicator
+            angle = data.get("angle", 0)
+            indicator_length = 40
+            end_x = x + math.cos(angle) * indicator_length
+            end_y = y + math.sin(angle) * indicator_length
+            aim_lines.append(((x, y), (end_x, end_y)))
+            
+            # Health bar
+            hp_pct = max(0, data["health"] / 100.0)
+            batch.queue_at(self.bars.health(60, 8, hp_pct, border=0), x - 30, y - 40)
         
-        # Draw map
-        self.map.draw(self.virtual_screen)
+        # Local player (smoother than the server position)
+        local = self.other_players.get(self.player_id)
+        if local and local["alive"]:
+            if sprites:
+                batch.queue(sprites.body("player", self.player.color, self.player.radius), player_x + ox, player_y + oy)
+            else:
+                batch.queue(self.bars.body(self.player.color, self.player.radius), player_x + ox, player_y + oy)
         
-        # Draw ALL players from server state
-        for p_id, p_data in self.other_players.items():
-            if not p_data["alive"]:
+        # LOCAL projectiles (supers keep their animated glow). Ones fired
+        # since the last step have no previous position and sit still.
+        previous = self.previous_projectiles
+        for proj in self.projectiles:
+            prev_x, prev_y = previous.get(proj.id, (proj.x, proj.y))
+            x = prev_x + (proj.x - prev_x) * alpha
+            y = prev_y + (proj.y - prev_y) * alpha
+            if not camera.is_visible(x, y, margin):
                 continue
-                
-            if p_id == self.player_id:
-                # Draw local player using local drawing logic (smoother)
-                self.player.draw(self.virtual_screen, is_local=True)
+            if sprites and not proj.is_super:
+                batch.queue(sprites.sprite("bullet"), x + ox, y + oy)
             else:
-                # Draw remote player
-                pygame.draw.circle(self.virtual_screen, p_data["color"], (int(p_data["x"]), int(p_data["y"])), 25)
-                
-                # Draw remote player aim indicator
-                angle = p_data.get("angle", 0)
-                indicator_length = 40
-                end_x = p_data["x"] + math.cos(angle) * indicator_length
-                end_y = p_data["y"] + math.sin(angle) * indicator_length
-                pygame.draw.line(self.virtual_screen, (255, 100, 100), (p_data["x"], p_data["y"]), (end_x, end_y), 3)
-                
-                # Health bar
-                pygame.draw.rect(self.virtual_screen, (255, 0, 0), (p_data["x"]-30, p_data["y"]-40, 60, 8))
-                hp_pct = max(0, p_data["health"] / 100.0)
-                pygame.draw.rect(self.virtual_screen, (0, 255, 0), (p_data["x"]-30, p_data["y"]-40, 60*hp_pct, 8))
-                
-                # Draw their projectiles
-                if "projectiles" in p_data:
-                    for proj in p_data["projectiles"]:
-                         is_super = proj.get("is_super", False)
-                         if not is_super:
-                            pygame.draw.circle(self.virtual_screen, (255, 255, 0), (int(proj["x"]), int(proj["y"])), 8)
-                         else:
-                            # Simple remote super draw (energy ball)
-                            r = 22
-                            pygame.draw.circle(self.virtual_screen, (0, 200, 255), (int(proj["x"]), int(proj["y"])), r)
-                            pygame.draw.circle(self.virtual_screen, (200, 240, 255), (int(proj["x"]), int(proj["y"])), int(r*0.6))
+                proj.draw(self.virtual_screen, (x - proj.x + ox, y - proj.y + oy))
+        batch.flush(self.virtual_screen)
+        for start, end in aim_lines:
+            pygame.draw.line(self.virtual_screen, (255, 100, 100), start, end, 3)
+        
+        if local and local["alive"]:
+            # offset shifts the player's latest position to the interpolated one
+            self.player.draw(self.virtual_screen, is_local=True, body=False, bars=self.bars,
+                             offset=(player_x - self.player.x + ox, player_y - self.player.y + oy))
 
-        # Draw LOCAL projectiles (Fix for bullet visibility)
-        for proj in self.projectiles:
-            proj.draw(self.virtual_screen)
+        # Mode entities (ball, PvE enemies and their shots)
+        self.mode.draw(self.virtual_screen, offset)
+        self.profiler.mark("entities")
 
         # Draw UI
         self.draw_ui()
+        self.profiler.mark("hud")
         
         # Scale the entire virtual screen to the actual screen size
         scaled_frame = pygame.transform.scale(self.virtual_screen, (self.screen_width, self.screen_height))
         self.screen.blit(scaled_frame, (0, 0))
+        self.profiler.mark("scale_blit")
+        
+        # Profiler overlay is drawn at native resolution so it stays readable
+        if self.profiler.enabled:
+            self.profiler.draw(self.screen)
+            self.profiler.mark("overlay")
         
         pygame.display.flip()
+        self.profiler.mark("flip")
     
     def draw_ui(self):
         # Player health
@@ -238,9 +390,9 @@ class Game:
         pygame.draw.rect(self.virtual_screen, (50, 50, 50), (20, 135, bar_w, bar_h))
         pygame.draw.rect(self.virtual_screen, (0, 150, 255), (20, 135, bar_w * (self.player.super_meter/100.0), bar_h))
         
-        if self.player.health <= 0:
+        if self.player.health <= 0 and not self.mode.pve:
              respawn_text = self.large_font.render("RESPAWNING...", True, (255, 0, 0))
-             self.virtual_screen.blit(respawn_text, (self.WORLD_WIDTH//2 - 200, self.WORLD_HEIGHT//2))
+             self.virtual_screen.blit(respawn_text, (self.VIEW_WIDTH//2 - 200, self.VIEW_HEIGHT//2))
         
         # Mode-specific UI (Knockout walls etc)
         self.mode.draw_ui(self.virtual_screen, self.font, self.player, [])
@@ -248,9 +400,29 @@ class Game:
 
     
     def run(self):
+        step = 1.0 / SIM_RATE
+        accumulator = 0.0
+        self.clock.tick()
         while self.running:
+            self.profiler.begin_frame()
             self.handle_input()
-            self.update()
-            self.draw()
+            self.profiler.mark("input")
+            
+            # Run as many fixed steps as the time since the last frame covers
+            accumulator = min(accumulator + self.clock.get_time() / 1000.0, MAX_STEPS * step)
+            stepped = False
+            while accumulator >= step:
+                self.update()
+                accumulator -= step
+                stepped = True
+            self.profiler.mark("simulation")
+            if stepped:
+                self.sync()
+                self.profiler.mark("network")
+            
+            self.draw(accumulator / step)
             self.clock.tick(self.fps)
+            self.profiler.mark("idle")
+            self.profiler.end_frame()
+        self.profiler.close()
 
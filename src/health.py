@@ -1,15 +1,13 @@
 import pygame
+from src.state import HealthTokenState
 
-class HealthToken:
-    def __init__(self, x, y, amount=25):
-        self.x = x
-        self.y = y
-        self.amount = amount
-        self.radius = 10
-        self.rect = pygame.Rect(x - self.radius, y - self.radius, self.radius * 2, self.radius * 2)
-    
-    def update(self):
-        self.rect = pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
+class HealthToken(HealthTokenState):
+    """Renderable health pickup. State lives in HealthTokenState."""
+    __slots__ = ()
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.bounds())
     
     def draw(self, surface):
         # Draw health token as a red circle with green cross
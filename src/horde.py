@@ -0,0 +1,300 @@
+import math
+import numpy as np
+import pygame
+from src.projectile import Projectile
+from src.navigation import UNREACHABLE
+
+# Array-backed enemy manager. Holds the same per-enemy state as
+# EnemyState, one NumPy array per field, and runs the EnemyState.update /
+# shoot_at / fire_super logic for all enemies at once. Used by the
+# Survival mode where hundreds of enemies are on screen.
+
+
+class Horde:
+    def __init__(self, capacity=512, radius=20, color=(255, 50, 50), seed=None):
+        self.capacity = capacity
+        self.radius = radius
+        self.color = color
+        self.rng = np.random.default_rng(seed)
+
+        # Same tuning as EnemyState
+        self.speed = 3
+        self.max_health = 50
+        self.shoot_delay = 60
+        self.super_max = 100.0
+        self.super_charge_per_hit = 25.0
+        self.super_cooldown_delay = 30
+        self.dodge_radius = 150
+        self.shoot_range = None  # None = shoot from anywhere, like Enemy
+
+        # Optional navigation (see src/navigation.py). With a flow field,
+        # enemies further than engage_distance cells from their target
+        # follow it; closer ones strafe like Enemy. The grid keeps them
+        # out of walls.
+        self.flow_field = None
+        self.grid = None
+        self.engage_distance = 6
+        # Optional VisibilityGrid: enemies without line of sight hold fire
+        self.visibility = None
+
+        n = capacity
+        self.alive = np.zeros(n, dtype=bool)
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.vel_x = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.health = np.zeros(n)
+        self.shoot_cooldown = np.zeros(n, dtype=np.int32)
+        self.super_meter = np.zeros(n)
+        self.super_cooldown = np.zeros(n, dtype=np.int32)
+        self.dodge_timer = np.zeros(n, dtype=np.int32)
+        self.dodge_cooldown = np.zeros(n, dtype=np.int32)
+        self.move_direction = np.zeros(n, dtype=np.int32)
+        self.direction_change_counter = np.zeros(n, dtype=np.int32)
+        # Tick each enemy last ran think() on (see AIScheduler)
+        self.last_think = np.zeros(n, dtype=np.int64)
+        self.tick = 0
+
+        self.sprite = None  # enemy body, drawn on first use unless the game sets one
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def spawn(self, x, y):
+        """Spawn one enemy, returns its slot or None if the horde is full"""
+        free = np.flatnonzero(~self.alive)
+        if len(free) == 0:
+            return None
+        i = free[0]
+        self.alive[i] = True
+        self.x[i] = x
+        self.y[i] = y
+        self.vel_x[i] = 0
+        self.vel_y[i] = 0
+        self.health[i] = self.max_health
+        self.shoot_cooldown[i] = 0
+        self.super_meter[i] = 0
+        self.super_cooldown[i] = 0
+        self.dodge_timer[i] = 0
+        self.dodge_cooldown[i] = 0
+        self.move_direction[i] = self.rng.choice((-1, 1))
+        self.direction_change_counter[i] = 0
+        self.last_think[i] = self.tick
+        return i
+
+    def kill(self, idx):
+        self.alive[idx] = False
+
+    def update(self, screen_width, screen_height, projectiles=None, active=None):
+        """Advance every live enemy by one frame (think + integrate).
+
+        projectiles are the threats to dodge (anything with x, y, vel_x,
+        vel_y). active optionally restricts thinking to a subset (a
+        boolean mask or index array); everybody still moves.
+        """
+        self.think(projectiles, active)
+        self.integrate(screen_width, screen_height)
+
+    def think(self, projectiles=None, active=None):
+        """Run the AI decisions (dodging, strafing) for the active enemies.
+
+        Enemies that skipped some ticks catch their frame counters up by
+        the number of ticks since they last thought.
+        """
+        mask = self.alive if active is None else (self.alive & self._as_mask(active))
+        idx = np.flatnonzero(mask)
+        if len(idx) == 0:
+            return
+
+        elapsed = np.maximum(self.tick - self.last_think[idx], 1).astype(np.int32)
+        self.last_think[idx] = self.tick
+
+        self.direction_change_counter[idx] -= elapsed
+
+        # Threat scan: all enemy/projectile distances in one go
+        if projectiles:
+            ready = idx[self.dodge_cooldown[idx] <= 0]
+            if len(ready):
+                p = np.array([(pr.x, pr.y, pr.vel_x, pr.vel_y) for pr in projectiles], dtype=float)
+                dx = p[:, 0][None, :] - self.x[ready][:, None]
+                dy = p[:, 1][None, :] - self.y[ready][:, None]
+                in_danger = (dx * dx + dy * dy) < self.dodge_radius * self.dodge_radius
+                dodging = in_danger.any(axis=1)
+                if dodging.any():
+                    who = ready[dodging]
+                    # First projectile in the danger zone, like the per-enemy loop
+                    first = in_danger[dodging].argmax(axis=1)
+                    # Move perpendicular to projectile velocity
+                    self.vel_x[who] = -p[first, 3] * 0.5
+                    self.vel_y[who] = p[first, 2] * 0.5
+                    self.dodge_timer[who] = 15
+                    self.dodge_cooldown[who] = 60
+
+        # Resume normal movement if not dodging
+        dodging = self.dodge_timer[idx] > 0
+        self.dodge_timer[idx] = np.where(dodging, np.maximum(self.dodge_timer[idx] - elapsed, 0), self.dodge_timer[idx])
+        roaming = idx[~dodging]
+        if self.flow_field is not None and len(roaming):
+            dir_x, dir_y, distance = self.flow_field.sample_many(self.x[roaming], self.y[roaming])
+            chasing = (distance > self.engage_distance) & (distance != UNREACHABLE)
+            chasers = roaming[chasing]
+            self.vel_x[chasers] = dir_x[chasing] * self.speed
+            self.vel_y[chasers] = dir_y[chasing] * self.speed
+            roaming = roaming[~chasing]
+            self.vel_y[roaming] = 0
+        change = roaming[self.direction_change_counter[roaming] <= 0]
+        if len(change):
+            self.move_direction[change] = self.rng.integers(-1, 2, size=len(change))
+            self.direction_change_counter[change] = self.rng.integers(30, 91, size=len(change))
+        self.vel_x[roaming] = self.move_direction[roaming] * self.speed
+
+        self.dodge_cooldown[idx] = np.maximum(self.dodge_cooldown[idx] - elapsed, 0)
+
+    def integrate(self, screen_width, screen_height):
+        """Cheap per-tick kinematics for every live enemy"""
+        self.tick += 1
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return
+
+        # Stay within bounds, then move
+        r = self.radius
+        self.x[idx] = np.clip(self.x[idx], r, screen_width - r)
+        self.y[idx] = np.clip(self.y[idx], r, screen_height - r)
+        self.x[idx] += self.vel_x[idx]
+        self.y[idx] += self.vel_y[idx]
+
+        # Don't walk into walls: undo the step for anyone who ended up in a blocked cell
+        if self.grid is not None:
+            rows, cols = self.grid.cells_of(self.x[idx], self.y[idx])
+            stuck = idx[self.grid.blocked[rows, cols]]
+            self.x[stuck] -= self.vel_x[stuck]
+            self.y[stuck] -= self.vel_y[stuck]
+
+        self.shoot_cooldown[idx] = np.maximum(self.shoot_cooldown[idx] - 1, 0)
+        self.super_cooldown[idx] = np.maximum(self.super_cooldown[idx] - 1, 0)
+
+    def fire(self, targets, active=None):
+        """Shoot at the nearest target and fire supers when charged.
+
+        targets is a list of objects with x, y. Returns new Projectiles.
+        """
+        mask = self.alive if active is None else (self.alive & self._as_mask(active))
+        idx = np.flatnonzero(mask)
+        new_projectiles = []
+        if len(idx) == 0 or not targets:
+            return new_projectiles
+
+        # Nearest target per enemy
+        t = np.array([(tg.x, tg.y) for tg in targets], dtype=float)
+        dx = t[:, 0][None, :] - self.x[idx][:, None]
+        dy = t[:, 1][None, :] - self.y[idx][:, None]
+        dist_sq = dx * dx + dy * dy
+        nearest = dist_sq.argmin(axis=1)
+        rows = np.arange(len(idx))
+        dx = dx[rows, nearest]
+        dy = dy[rows, nearest]
+        dist = np.sqrt(dist_sq[rows, nearest])
+
+        shooting = (self.shoot_cooldown[idx] <= 0) & (dist > 0)
+        if self.shoot_range is not None:
+            shooting &= dist < self.shoot_range
+        if self.visibility is not None and shooting.any():
+            sel = np.flatnonzero(shooting)
+            sx = self.x[idx[sel]]
+            sy = self.y[idx[sel]]
+            shooting[sel] = self.visibility.can_see_many(sx, sy, sx + dx[sel], sy + dy[sel])
+        shooters = idx[shooting]
+        if len(shooters):
+            self.shoot_cooldown[shooters] = self.shoot_delay
+            cos_a = dx[shooting] / dist[shooting]
+            sin_a = dy[shooting] / dist[shooting]
+            px = self.x[shooters] + cos_a * (self.radius + 10)
+            py = self.y[shooters] + sin_a * (self.radius + 10)
+            self.super_meter[shooters] = np.minimum(self.super_max, self.super_meter[shooters] + self.super_charge_per_hit)
+            for i in range(len(shooters)):
+                new_projectiles.append(Projectile(px[i], py[i], cos_a[i] * 8, sin_a[i] * 8,
+                                                  owner="enemy", damage=15, color=(255, 100, 0)))
+
+        supers = idx[(self.super_meter[idx] >= self.super_max) & (self.super_cooldown[idx] <= 0)]
+        if len(supers):
+            self.super_meter[supers] = 0.0
+            self.super_cooldown[supers] = self.super_cooldown_delay
+            angle = self.rng.uniform(0, 2 * math.pi, size=len(supers))
+            proj_radius = 25
+            px = self.x[supers] + np.cos(angle) * (self.radius + proj_radius + 4)
+            py = self.y[supers] + np.sin(angle) * (self.radius + proj_radius + 4)
+            for i in range(len(supers)):
+                new_projectiles.append(Projectile(px[i], py[i], math.cos(angle[i]) * 14, math.sin(angle[i]) * 14,
+                                                  owner="enemy_super", damage=100, color=(255, 100, 200), radius=proj_radius))
+        return new_projectiles
+
+    def hit_test(self, projectiles):
+        """Apply player projectiles to the horde.
+
+        Returns the projectiles that hit something (callers remove them).
+        """
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0 or not projectiles:
+            return []
+        p = np.array([(pr.x, pr.y, pr.radius) for pr in projectiles], dtype=float)
+        dx = p[:, 0][:, None] - self.x[idx][None, :]
+        dy = p[:, 1][:, None] - self.y[idx][None, :]
+        reach = p[:, 2][:, None] + self.radius
+        hits = (dx * dx + dy * dy) < reach * reach
+
+        spent = []
+        for pi in np.flatnonzero(hits.any(axis=1)):
+            proj = projectiles[pi]
+            victims = idx[hits[pi]]
+            if not proj.is_super:
+                # Standard bullet hits one enemy
+                victims = victims[:1]
+                spent.append(proj)
+            self.health[victims] -= proj.damage
+        self.alive[idx] = self.health[idx] > 0
+        return spent
+
+    def _as_mask(self, active):
+        active = np.asarray(active)
+        if active.dtype == bool:
+            return active
+        mask = np.zeros(self.capacity, dtype=bool)
+        mask[active] = True
+        return mask
+
+    def draw(self, surface, offset=(0, 0)):
+        """Blit every living enemy that lands on the surface (offset = camera scroll)"""
+        ox, oy = offset
+        r = self.radius
+        width, height = surface.get_size()
+        margin = r + 12  # body plus health bar
+        sx = self.x + ox
+        sy = self.y + oy
+        on_screen = (self.alive & (sx > -margin) & (sx < width + margin)
+                     & (sy > -margin) & (sy < height + margin))
+        idx = np.flatnonzero(on_screen)
+        if len(idx) == 0:
+            return
+        if self.sprite is None:
+            # One pre-rendered enemy body (with eyes), blitted per enemy
+            size = r * 2
+            self.sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(self.sprite, self.color, (r, r), r)
+            pygame.draw.circle(self.sprite, (255, 255, 255), (r - 5, r - 3), 3)
+            pygame.draw.circle(self.sprite, (255, 255, 255), (r + 5, r - 3), 3)
+            pygame.draw.circle(self.sprite, (0, 0, 0), (r - 5, r - 3), 1)
+            pygame.draw.circle(self.sprite, (0, 0, 0), (r + 5, r - 3), 1)
+
+        w, h = self.sprite.get_size()
+        xs = (sx[idx] - w // 2).astype(int)
+        ys = (sy[idx] - h // 2).astype(int)
+        surface.blits([(self.sprite, (int(x), int(y))) for x, y in zip(xs, ys)], doreturn=False)
+
+        # Health bars only for damaged enemies
+        hurt = self.health[idx] < self.max_health
+        for i in idx[hurt]:
+            bar_x = sx[i] - 20
+            bar_y = sy[i] - r - 12
+            pygame.draw.rect(surface, (255, 0, 0), (bar_x, bar_y, 40, 5))
+            pygame.draw.rect(surface, (0, 255, 0), (bar_x, bar_y, 40 * self.health[i] / self.max_health, 5))
@@ -0,0 +1,101 @@
+import math
+from array import array
+
+# Server-side lag compensation. Every tick the simulation records where each
+# player is; when a shot comes in, targets are moved back to where they were
+# on the shooter's screen when it was fired, so a hit on a laggy client's
+# screen is a hit on the server too.
+#
+# Each player's history is a ring buffer in one flat array of doubles
+# (t, x, y, t, x, y, ...) sized for `window` seconds of ticks, so memory per
+# player is fixed and a lookup is a binary search over at most a few dozen
+# samples.
+
+
+class PositionHistory:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.samples = array("d", bytes(8 * 3 * capacity))
+        self.start = 0  # slot of the oldest sample
+        self.count = 0
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+    def record(self, t, x, y):
+        """Append a sample; t must not go backwards"""
+        if self.count < self.capacity:
+            slot = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        i = slot * 3
+        self.samples[i] = t
+        self.samples[i + 1] = x
+        self.samples[i + 2] = y
+
+    def _time(self, n):
+        """Time of the n-th oldest sample"""
+        return self.samples[(self.start + n) % self.capacity * 3]
+
+    def _position(self, n):
+        i = (self.start + n) % self.capacity * 3
+        return self.samples[i + 1], self.samples[i + 2]
+
+    def position_at(self, t):
+        """Interpolated (x, y) at time t, clamped to the recorded span.
+        None if nothing has been recorded."""
+        if self.count == 0:
+            return None
+        if t <= self._time(0):
+            return self._position(0)
+        last = self.count - 1
+        if t >= self._time(last):
+            return self._position(last)
+        # First sample later than t
+        lo, hi = 1, last
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time(mid) > t:
+                hi = mid
+            else:
+                lo = mid + 1
+        t0, t1 = self._time(lo - 1), self._time(lo)
+        x0, y0 = self._position(lo - 1)
+        x1, y1 = self._position(lo)
+        a = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+        return x0 + (x1 - x0) * a, y0 + (y1 - y0) * a
+
+
+class LagCompensator:
+    """Position histories for every player, `window` seconds deep"""
+    def __init__(self, window=0.5, tick_rate=30):
+        self.window = window
+        # +2: a sample at each end of the window for interpolation
+        self.capacity = int(math.ceil(window * tick_rate)) + 2
+        self.histories = {}
+
+    def record(self, p_id, t, x, y):
+        history = self.histories.get(p_id)
+        if history is None:
+            history = self.histories[p_id] = PositionHistory(self.capacity)
+        history.record(t, x, y)
+
+    def reset(self, p_id):
+        """Forget the trail, e.g. after a teleport, so nothing interpolates across it"""
+        history = self.histories.get(p_id)
+        if history:
+            history.clear()
+
+    def forget(self, p_id):
+        self.histories.pop(p_id, None)
+
+    def position_at(self, p_id, t, now):
+        """Where p_id was at time t, never rewinding more than window
+        seconds before now. None if there is no history."""
+        history = self.histories.get(p_id)
+        if history is None:
+            return None
+        return history.position_at(max(t, now - self.window))
@@ -8,10 +8,17 @@ class Wall:
         self.y = y
         self.width = width
         self.height = height
+        # Optional pre-tiled surface from the sprite atlas (see src/sprites.py)
+        self.texture = None
     
-    def draw(self, surface):
-        pygame.draw.rect(surface, (150, 100, 50), self.rect)
-        pygame.draw.rect(surface, (200, 150, 100), self.rect, 3)
+    def draw(self, surface, offset=(0, 0)):
+        rect = self.rect.move(offset)
+        if self.texture:
+            surface.blit(self.texture, rect)
+            pygame.draw.rect(surface, (200, 150, 100), rect, 3)
+            return
+        pygame.draw.rect(surface, (150, 100, 50), rect)
+        pygame.draw.rect(surface, (200, 150, 100), rect, 3)
     
     def collides_with_point(self, x, y, radius):
         """Check if a circle centered at (x, y) collides with this wall"""
@@ -56,15 +63,19 @@ class Map:
             pygame.Rect(self.width // 2 - 100, self.height - 300, 200, 150),
         ]
     
-    def draw(self, surface):
+    def draw(self, surface, offset=(0, 0)):
+        ox, oy = offset
         # Draw obstacles
         for obstacle in self.obstacles:
-            pygame.draw.rect(surface, (100, 100, 100), obstacle)
-            pygame.draw.rect(surface, (150, 150, 150), obstacle, 3)
+            pygame.draw.rect(surface, (100, 100, 100), obstacle.move(offset))
+            pygame.draw.rect(surface, (150, 150, 150), obstacle.move(offset), 3)
         
-        # Draw grid background
+        # Draw grid background (only the lines that land on the surface)
         grid_size = 50
+        width, height = surface.get_size()
         for x in range(0, self.width, grid_size):
-            pygame.draw.line(surface, (60, 60, 60), (x, 0), (x, self.height), 1)
+            if 0 <= x + ox < width:
+                pygame.draw.line(surface, (60, 60, 60), (x + ox, oy), (x + ox, self.height + oy), 1)
         for y in range(0, self.height, grid_size):
-            pygame.draw.line(surface, (60, 60, 60), (0, y), (self.width, y), 1)
+            if 0 <= y + oy < height:
+                pygame.draw.line(surface, (60, 60, 60), (ox, y + oy), (self.width + ox, y + oy), 1)
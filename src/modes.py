@@ -1,7 +1,30 @@
 import pygame
-import math
 import random
 from src.map import Wall
+from src.horde import Horde
+from src.ai_scheduler import AIScheduler
+from src.navigation import OccupancyGrid, FlowField
+from src.visibility import VisibilityGrid
+from src.ball import TEAM_SIDES
+
+def create_arena_walls(width, height):
+    """Create walls around the arena"""
+    walls = []
+    center_x = width // 2
+    center_y = height // 2
+    
+    # Four corner walls for cover
+    walls.append(Wall(center_x - 300, center_y - 250, 120, 150))  # Top-left
+    walls.append(Wall(center_x + 180, center_y - 250, 120, 150))  # Top-right
+    walls.append(Wall(center_x - 300, center_y + 100, 120, 150))  # Bottom-left
+    walls.append(Wall(center_x + 180, center_y + 100, 120, 150))  # Bottom-right
+    
+    # Middle walls for more cover
+    walls.append(Wall(center_x - 80, center_y - 120, 160, 80))  # Top-center
+    walls.append(Wall(center_x - 80, center_y + 40, 160, 80))   # Bottom-center
+    
+    return walls
+
 
 class GameMode:
     """Base class for game modes"""
@@ -10,11 +33,24 @@ class GameMode:
         self.height = height
         self.game_over = False
         self.winner = None
+        # PvE modes own the local player's health instead of the server
+        self.pve = False
+        # The local player's Camera (src/camera.py), set by Game
+        self.camera = None
     
     def update(self, player, enemies, projectiles):
         """Update mode-specific logic. Override in subclasses."""
         pass
     
+    def apply_server_state(self, server_data):
+        """Take mode state the server is authoritative for. Override in subclasses."""
+        pass
+    
+    def draw(self, surface, offset=(0, 0)):
+        """Draw mode-specific world objects (under the UI), shifted by the
+        camera offset. Walls are drawn by the game. Override in subclasses."""
+        pass
+    
     def draw_ui(self, surface, font, player, enemies):
         """Draw mode-specific UI. Override in subclasses."""
         pass
@@ -34,22 +70,7 @@ class Knockout(GameMode):
         self.walls = self._create_walls()
         
     def _create_walls(self):
-        """Create walls around the arena"""
-        walls = []
-        center_x = self.width // 2
-        center_y = self.height // 2
-        
-        # Four corner walls for cover
-        walls.append(Wall(center_x - 300, center_y - 250, 120, 150))  # Top-left
-        walls.append(Wall(center_x + 180, center_y - 250, 120, 150))  # Top-right
-        walls.append(Wall(center_x - 300, center_y + 100, 120, 150))  # Bottom-left
-        walls.append(Wall(center_x + 180, center_y + 100, 120, 150))  # Bottom-right
-        
-        # Middle walls for more cover
-        walls.append(Wall(center_x - 80, center_y - 120, 160, 80))  # Top-center
-        walls.append(Wall(center_x - 80, center_y + 40, 160, 80))   # Bottom-center
-        
-        return walls
+        return create_arena_walls(self.width, self.height)
     
     def check_win_condition(self, player, enemies):
         if player.health <= 0:
@@ -63,87 +84,39 @@ class Knockout(GameMode):
         return False
     
     def draw_ui(self, surface, font, player, enemies):
-        # Draw walls
-        for wall in self.walls:
-            wall.draw(surface)
-            
         text = font.render(f"Mode: {self.mode_name} | Enemies Remaining: {len(enemies)}", True, (255, 255, 0))
-        surface.blit(text, (self.width // 2 - text.get_width() // 2, 20))
+        surface.blit(text, (surface.get_width() // 2 - text.get_width() // 2, 20))
 
 
 class BrawlBall(GameMode):
     """Soccer-like: Shoot ball into enemy goal"""
-    def __init__(self, width, height):
+    def __init__(self, width, height, side="left"):
         super().__init__(width, height)
         self.mode_name = "Brawl Ball"
+        # The half our team starts on and the goal we defend (src/ball.py team_side)
+        self.side = side
         self.ball_x = width // 2
         self.ball_y = height // 2
         self.ball_radius = 10
         self.ball_vel_x = 0
         self.ball_vel_y = 0
-        self.ball_friction = 0.95
         self.player_score = 0
         self.enemy_score = 0
         self.goals_to_win = 2
     
-    def update(self, player, enemies, projectiles):
-        # Ball physics
-        self.ball_vel_x *= self.ball_friction
-        self.ball_vel_y *= self.ball_friction
-        self.ball_x += self.ball_vel_x
-        self.ball_y += self.ball_vel_y
-        
-        # Ball stays in bounds
-        if self.ball_x - self.ball_radius < 0:
-            self.ball_x = self.ball_radius
-            self.ball_vel_x *= -0.8
-        if self.ball_x + self.ball_radius > self.width:
-            self.ball_x = self.width - self.ball_radius
-            self.ball_vel_x *= -0.8
-        if self.ball_y - self.ball_radius < 0:
-            self.ball_y = self.ball_radius
-            self.ball_vel_y *= -0.8
-        if self.ball_y + self.ball_radius > self.height:
-            self.ball_y = self.height - self.ball_radius
-            self.ball_vel_y *= -0.8
-        
-        # Check if player pushes ball
-        dist_to_ball = math.sqrt((player.x - self.ball_x)**2 + (player.y - self.ball_y)**2)
-        if dist_to_ball < player.radius + self.ball_radius:
-            dx = self.ball_x - player.x
-            dy = self.ball_y - player.y
-            if math.sqrt(dx**2 + dy**2) > 0:
-                angle = math.atan2(dy, dx)
-                self.ball_vel_x = math.cos(angle) * 8
-                self.ball_vel_y = math.sin(angle) * 8
-        
-        # Check if enemy pushes ball
-        for enemy in enemies:
-            dist_to_ball = math.sqrt((enemy.x - self.ball_x)**2 + (enemy.y - self.ball_y)**2)
-            if dist_to_ball < enemy.radius + self.ball_radius:
-                dx = self.ball_x - enemy.x
-                dy = self.ball_y - enemy.y
-                if math.sqrt(dx**2 + dy**2) > 0:
-                    angle = math.atan2(dy, dx)
-                    self.ball_vel_x = math.cos(angle) * 6
-                    self.ball_vel_y = math.sin(angle) * 6
-        
-        # Check goals
-        # Player goal (right side)
-        if self.ball_x > self.width - 50 and 100 < self.ball_y < self.height - 100:
-            self.enemy_score += 1
-            self.reset_ball()
-        
-        # Enemy goal (left side)
-        if self.ball_x < 50 and 100 < self.ball_y < self.height - 100:
-            self.player_score += 1
-            self.reset_ball()
-    
-    def reset_ball(self):
-        self.ball_x = self.width // 2
-        self.ball_y = self.height // 2
-        self.ball_vel_x = 0
-        self.ball_vel_y = 0
+    def apply_server_state(self, server_data):
+        # Ball physics run on the server (src/ball.py); we just draw it
+        ball = server_data.get("ball")
+        if not ball:
+            return
+        self.ball_x = ball["x"]
+        self.ball_y = ball["y"]
+        self.ball_vel_x = ball["vel_x"]
+        self.ball_vel_y = ball["vel_y"]
+        # The server counts goals per goal zone; ours is the one we defend
+        their_side = TEAM_SIDES[1 - TEAM_SIDES.index(self.side)]
+        self.player_score = ball["goals_" + their_side]
+        self.enemy_score = ball["goals_" + self.side]
     
     def check_win_condition(self, player, enemies):
         if player.health <= 0:
@@ -164,18 +137,129 @@ class BrawlBall(GameMode):
             return True
         return False
     
-    def draw_ui(self, surface, font, player, enemies):
-        # Draw goals (zones)
-        pygame.draw.rect(surface, (100, 200, 100), (self.width - 60, 100, 50, self.height - 200), 3)
-        pygame.draw.rect(surface, (200, 100, 100), (10, 100, 50, self.height - 200), 3)
+    def draw(self, surface, offset=(0, 0)):
+        ox, oy = offset
+        # Draw goals (zones): the one to score in green, our own in red
+        right_color, left_color = (100, 200, 100), (200, 100, 100)
+        if self.side == "right":
+            right_color, left_color = left_color, right_color
+        pygame.draw.rect(surface, right_color, (self.width - 60 + ox, 100 + oy, 50, self.height - 200), 3)
+        pygame.draw.rect(surface, left_color, (10 + ox, 100 + oy, 50, self.height - 200), 3)
         
         # Draw ball
-        pygame.draw.circle(surface, (255, 255, 255), (int(self.ball_x), int(self.ball_y)), self.ball_radius)
-        pygame.draw.circle(surface, (200, 200, 200), (int(self.ball_x), int(self.ball_y)), self.ball_radius, 2)
-        
+        ball_pos = (int(self.ball_x + ox), int(self.ball_y + oy))
+        pygame.draw.circle(surface, (255, 255, 255), ball_pos, self.ball_radius)
+        pygame.draw.circle(surface, (200, 200, 200), ball_pos, self.ball_radius, 2)
+    
+    def draw_ui(self, surface, font, player, enemies):
         # Draw score
         mode_text = font.render(f"Mode: {self.mode_name}", True, (255, 255, 0))
         score_text = font.render(f"Score: {self.player_score} - {self.enemy_score}", True, (255, 255, 255))
         
-        surface.blit(mode_text, (self.width // 2 - mode_text.get_width() // 2, 20))
-        surface.blit(score_text, (self.width // 2 - score_text.get_width() // 2, 60))
+        surface.blit(mode_text, (surface.get_width() // 2 - mode_text.get_width() // 2, 20))
+        surface.blit(score_text, (surface.get_width() // 2 - score_text.get_width() // 2, 60))
+
+
+class Survival(GameMode):
+    """PvE: survive ever larger waves of enemies"""
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        self.mode_name = "Survival"
+        self.pve = True
+        self.horde = Horde(capacity=1024)
+        # Only enemies near the player think every tick; AI work per tick is capped
+        self.scheduler = AIScheduler(buckets=4, budget=256)
+        
+        # Same cover as Knockout; enemies path around it with one shared flow field
+        self.walls = create_arena_walls(width, height)
+        self.grid = OccupancyGrid(width, height, self.walls, cell_size=40, clearance=self.horde.radius + 4)
+        self.flow_field = FlowField(self.grid)
+        self.horde.flow_field = self.flow_field
+        self.horde.grid = self.grid
+        self.horde.visibility = VisibilityGrid(width, height, self.walls)
+        self.enemy_projectiles = []
+        self.wave = 0
+        self.base_wave_size = 20
+        self.kills = 0
+    
+    def spawn_wave(self):
+        self.wave += 1
+        count = min(self.horde.capacity - len(self.horde), self.base_wave_size * self.wave)
+        for i in range(count):
+            # Spawn around the edges of the arena
+            edge = random.randint(0, 3)
+            if edge == 0:
+                x, y = random.uniform(0, self.width), 30
+            elif edge == 1:
+                x, y = random.uniform(0, self.width), self.height - 30
+            elif edge == 2:
+                x, y = 30, random.uniform(0, self.height)
+            else:
+                x, y = self.width - 30, random.uniform(0, self.height)
+            self.horde.spawn(x, y)
+    
+    def update(self, player, enemies, projectiles):
+        if self.game_over:
+            return
+        if len(self.horde) == 0:
+            self.spawn_wave()
+        
+        # Only rebuilds when the player moves into a different cell
+        self.flow_field.update([player])
+        
+        # Full-rate AI only for enemies on screen (a 1920x1080 view
+        # around the player when there is no camera, e.g. headless)
+        if self.camera:
+            view_rect = self.camera.rect
+        else:
+            view_rect = (player.x - 960, player.y - 540, 1920, 1080)
+        thinking = self.scheduler.select(self.horde.x, self.horde.y, self.horde.alive, [player], view_rect)
+        self.horde.think(projectiles, thinking)
+        self.horde.integrate(self.width, self.height)
+        if player.health > 0:
+            self.enemy_projectiles.extend(self.horde.fire([player], thinking))
+        
+        # Player bullets vs horde
+        before = len(self.horde)
+        for proj in self.horde.hit_test(projectiles):
+            projectiles.remove(proj)
+        self.kills += before - len(self.horde)
+        
+        # Enemy bullets vs player
+        for proj in self.enemy_projectiles[:]:
+            proj.update()
+            if proj.is_off_screen(self.width, self.height):
+                self.enemy_projectiles.remove(proj)
+                continue
+            if any(wall.collides_with_point(proj.x, proj.y, proj.radius) for wall in self.walls):
+                self.enemy_projectiles.remove(proj)
+                continue
+            reach = player.radius + proj.radius
+            if (proj.x - player.x)**2 + (proj.y - player.y)**2 < reach * reach:
+                player.take_damage(proj.damage)
+                self.enemy_projectiles.remove(proj)
+        
+        self.check_win_condition(player, enemies)
+    
+    def check_win_condition(self, player, enemies):
+        if player.health <= 0:
+            player.health = 0
+            self.game_over = True
+            self.winner = f"GAME OVER - Survived {self.wave - 1} waves"
+            return True
+        return False
+    
+    def draw(self, surface, offset=(0, 0)):
+        self.horde.draw(surface, offset)
+        ox, oy = offset
+        width, height = surface.get_size()
+        for proj in self.enemy_projectiles:
+            if -30 < proj.x + ox < width + 30 and -30 < proj.y + oy < height + 30:
+                proj.draw(surface, offset)
+    
+    def draw_ui(self, surface, font, player, enemies):
+        text = font.render(f"Mode: {self.mode_name} | Wave {self.wave} | Enemies: {len(self.horde)} | Kills: {self.kills}", True, (255, 255, 0))
+        surface.blit(text, (surface.get_width() // 2 - text.get_width() // 2, 20))
+        if self.game_over:
+            end_text = font.render(self.winner, True, (255, 0, 0))
+            surface.blit(end_text, (surface.get_width() // 2 - end_text.get_width() // 2, surface.get_height() // 2 - 60))
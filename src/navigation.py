@@ -0,0 +1,141 @@
+import math
+import numpy as np
+
+# Grid navigation shared by every chaser. The occupancy grid is built once
+# from the static walls; a FlowField holds, for every free cell, the
+# BFS distance to the nearest target and a unit direction towards it.
+# Agents just look up the cell they are standing in, so steering hundreds
+# of enemies costs the same as steering one.
+
+NEIGHBORS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+def wall_rects(walls):
+    """Accept Wall objects or (x, y, w, h) tuples"""
+    rects = []
+    for wall in walls:
+        if hasattr(wall, "width"):
+            rects.append((wall.x, wall.y, wall.width, wall.height))
+        else:
+            rects.append(tuple(wall))
+    return rects
+
+
+class OccupancyGrid:
+    def __init__(self, width, height, walls, cell_size=40, clearance=0):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        self.blocked = np.zeros((self.rows, self.cols), dtype=bool)
+
+        # A cell is blocked if its centre is within `clearance` of a wall,
+        # i.e. an agent of that radius standing there would overlap it
+        centers_x = (np.arange(self.cols) + 0.5) * cell_size
+        centers_y = (np.arange(self.rows) + 0.5) * cell_size
+        cx, cy = np.meshgrid(centers_x, centers_y)
+        for rx, ry, rw, rh in wall_rects(walls):
+            closest_x = np.clip(cx, rx, rx + rw)
+            closest_y = np.clip(cy, ry, ry + rh)
+            self.blocked |= (cx - closest_x)**2 + (cy - closest_y)**2 < max(clearance, 1)**2
+
+    def cell_of(self, x, y):
+        col = min(self.cols - 1, max(0, int(x // self.cell_size)))
+        row = min(self.rows - 1, max(0, int(y // self.cell_size)))
+        return row, col
+
+    def cells_of(self, xs, ys):
+        cols = np.clip((xs // self.cell_size).astype(np.int64), 0, self.cols - 1)
+        rows = np.clip((ys // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return rows, cols
+
+    def is_blocked(self, x, y):
+        return bool(self.blocked[self.cell_of(x, y)])
+
+
+class FlowField:
+    def __init__(self, grid):
+        self.grid = grid
+        self.distance = np.full((grid.rows, grid.cols), UNREACHABLE, dtype=np.int32)
+        self.dir_x = np.zeros((grid.rows, grid.cols))
+        self.dir_y = np.zeros((grid.rows, grid.cols))
+        self.target_cells = None
+        self.rebuilds = 0
+
+    def update(self, targets):
+        """Point the field at targets (objects with x, y or (x, y) pairs).
+
+        Only rebuilds when the set of target cells changed, so calling
+        this every frame is cheap. Returns True if it rebuilt.
+        """
+        cells = set()
+        for t in targets:
+            x, y = (t.x, t.y) if hasattr(t, "x") else t
+            cells.add(self.grid.cell_of(x, y))
+        cells = frozenset(cells)
+        if cells == self.target_cells:
+            return False
+        self.target_cells = cells
+        self._rebuild(cells)
+        return True
+
+    def _rebuild(self, cells):
+        grid = self.grid
+        rows, cols = grid.rows, grid.cols
+        blocked = grid.blocked
+        dist = np.full((rows, cols), UNREACHABLE, dtype=np.int32)
+
+        # Multi-source BFS over free cells (4-connected distances), one whole
+        # wavefront per step as array operations: as many steps as the
+        # farthest cell is away, instead of a Python loop over every cell
+        frontier = np.zeros((rows, cols), dtype=bool)
+        for cell in cells:
+            frontier[cell] = True
+        unvisited = ~blocked & ~frontier
+        d = 0
+        while frontier.any():
+            dist[frontier] = d
+            d += 1
+            grown = np.zeros((rows, cols), dtype=bool)
+            grown[1:, :] |= frontier[:-1, :]
+            grown[:-1, :] |= frontier[1:, :]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & unvisited
+            unvisited &= ~frontier
+        self.distance = dist
+
+        # Direction per cell: towards the lowest-distance neighbour. Diagonals
+        # are only allowed if both orthogonal cells are free (no corner cutting).
+        padded = np.full((rows + 2, cols + 2), UNREACHABLE, dtype=np.int64)
+        padded[1:-1, 1:-1] = dist
+        free = np.zeros((rows + 2, cols + 2), dtype=bool)
+        free[1:-1, 1:-1] = ~blocked
+
+        best = dist.astype(np.int64)
+        dir_x = np.zeros((rows, cols))
+        dir_y = np.zeros((rows, cols))
+        for dc, dr in NEIGHBORS:
+            neighbor = padded[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+            if dr and dc:
+                ok = free[1 + dr:rows + 1 + dr, 1:-1] & free[1:-1, 1 + dc:cols + 1 + dc]
+                neighbor = np.where(ok, neighbor, UNREACHABLE)
+            better = neighbor < best
+            best = np.where(better, neighbor, best)
+            norm = math.sqrt(dr * dr + dc * dc)
+            dir_x = np.where(better, dc / norm, dir_x)
+            dir_y = np.where(better, dr / norm, dir_y)
+        self.dir_x = dir_x
+        self.dir_y = dir_y
+        self.rebuilds += 1
+
+    def sample(self, x, y):
+        """(dir_x, dir_y, distance_in_cells) at a world position"""
+        cell = self.grid.cell_of(x, y)
+        return self.dir_x[cell], self.dir_y[cell], self.distance[cell]
+
+    def sample_many(self, xs, ys):
+        rows, cols = self.grid.cells_of(xs, ys)
+        return self.dir_x[rows, cols], self.dir_y[rows, cols], self.distance[rows, cols]
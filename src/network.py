@@ -1,12 +1,28 @@
 import socket
-import pickle
+from src.protocol import HEADER, send_msg, recv_frame, decode_payload
+
+def merge_world(players, update):
+    """Apply a server update to the client's {player_id: player} view.
+
+    Full snapshots replace it. Partial ones (src/send_scheduler.py) only
+    carry the players that were worth sending this time, plus ids to drop.
+    """
+    if update.get("full", True):
+        return update["players"]
+    for p_id in update["removed"]:
+        players.pop(p_id, None)
+    players.update(update["players"])
+    return players
+
 
 class Network:
-    def __init__(self, server_ip="127.0.0.1"):
+    def __init__(self, server_ip="127.0.0.1", port=5555):
         self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server = server_ip
-        self.port = 5555
+        self.port = port
         self.addr = (self.server, self.port)
+        self.bytes_sent = 0
+        self.bytes_received = 0
         self.p = self.connect()
 
     def getP(self):
@@ -15,13 +31,20 @@ class Network:
     def connect(self):
         try:
             self.client.connect(self.addr)
-            return pickle.loads(self.client.recv(2048*4))
+            return self.receive()
         except:
             pass
 
+    def receive(self):
+        payload = recv_frame(self.client)
+        if payload is None:
+            raise socket.error("Connection closed by server")
+        self.bytes_received += HEADER.size + len(payload)
+        return decode_payload(payload)
+
     def send(self, data):
         try:
-            self.client.send(pickle.dumps(data))
-            return pickle.loads(self.client.recv(2048*4))
+            self.bytes_sent += send_msg(self.client, data)
+            return self.receive()
         except socket.error as e:
             print(e)
@@ -0,0 +1,141 @@
+import math
+
+# Swept (continuous) collision tests. Each takes the start and end of a
+# movement during one step and returns the fraction t in [0, 1] of the
+# step at which contact first happens, or None if it doesn't. Testing
+# the whole path instead of just the end position means fast objects
+# can't tunnel through thin walls or players at low tick rates.
+
+
+def sweep_circle_circle(x0, y0, x1, y1, radius, cx, cy, cradius):
+    """Circle moving from (x0, y0) to (x1, y1) against a static circle.
+
+    Returns t of first contact (0 if already overlapping) or None.
+    With radius=0 this is a segment vs circle test.
+    """
+    reach = radius + cradius
+    mx = x0 - cx
+    my = y0 - cy
+    c = mx * mx + my * my - reach * reach
+    if c <= 0:
+        return 0.0
+    dx = x1 - x0
+    dy = y1 - y0
+    a = dx * dx + dy * dy
+    if a == 0:
+        return None
+    b = 2 * (mx * dx + my * dy)
+    if b >= 0:
+        return None  # moving away
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2 * a)
+    if 0 <= t <= 1:
+        return t
+    return None
+
+
+def segment_circle(x0, y0, x1, y1, cx, cy, radius):
+    """Does the segment (x0, y0)-(x1, y1) pass within radius of (cx, cy)? Returns t or None."""
+    return sweep_circle_circle(x0, y0, x1, y1, 0, cx, cy, radius)
+
+
+def _ray_box(x0, y0, dx, dy, left, top, right, bottom):
+    """Slab test. Returns (t_enter, normal_x, normal_y) or None."""
+    t_enter = -math.inf
+    t_exit = math.inf
+    nx = ny = 0.0
+    if dx == 0:
+        if x0 < left or x0 > right:
+            return None
+    else:
+        t1 = (left - x0) / dx
+        t2 = (right - x0) / dx
+        n = -1.0
+        if t1 > t2:
+            t1, t2 = t2, t1
+            n = 1.0
+        if t1 > t_enter:
+            t_enter, nx, ny = t1, n, 0.0
+        t_exit = min(t_exit, t2)
+    if dy == 0:
+        if y0 < top or y0 > bottom:
+            return None
+    else:
+        t1 = (top - y0) / dy
+        t2 = (bottom - y0) / dy
+        n = -1.0
+        if t1 > t2:
+            t1, t2 = t2, t1
+            n = 1.0
+        if t1 > t_enter:
+            t_enter, nx, ny = t1, 0.0, n
+        t_exit = min(t_exit, t2)
+    if t_enter > t_exit or t_exit < 0 or t_enter > 1:
+        return None
+    return t_enter, nx, ny
+
+
+def sweep_circle_aabb(x0, y0, x1, y1, radius, rect):
+    """Circle moving from (x0, y0) to (x1, y1) against a rect (x, y, w, h).
+
+    Returns (t, normal_x, normal_y) of first contact or None. The normal
+    points out of the rect, for bouncing. An already-overlapping circle
+    returns t=0 with the push-out direction.
+    """
+    rx, ry, rw, rh = rect
+    # Already touching?
+    closest_x = max(rx, min(x0, rx + rw))
+    closest_y = max(ry, min(y0, ry + rh))
+    ox = x0 - closest_x
+    oy = y0 - closest_y
+    dist_sq = ox * ox + oy * oy
+    if dist_sq < radius * radius:
+        dist = math.sqrt(dist_sq)
+        if dist == 0:
+            return 0.0, 0.0, -1.0
+        return 0.0, ox / dist, oy / dist
+
+    dx = x1 - x0
+    dy = y1 - y0
+    # Ray against the rect grown by the radius (Minkowski sum)...
+    hit = _ray_box(x0, y0, dx, dy, rx - radius, ry - radius, rx + rw + radius, ry + rh + radius)
+    if hit is None:
+        return None
+    t, nx, ny = hit
+    if t < 0:
+        return None
+    hx = x0 + dx * t
+    hy = y0 + dy * t
+    # ...whose corners are really quarter circles
+    corner_x = rx if hx < rx else (rx + rw if hx > rx + rw else None)
+    corner_y = ry if hy < ry else (ry + rh if hy > ry + rh else None)
+    if corner_x is not None and corner_y is not None:
+        t = sweep_circle_circle(x0, y0, x1, y1, radius, corner_x, corner_y, 0)
+        if t is None:
+            return None
+        cx = x0 + dx * t - corner_x
+        cy = y0 + dy * t - corner_y
+        length = math.sqrt(cx * cx + cy * cy) or 1.0
+        return t, cx / length, cy / length
+    return t, nx, ny
+
+
+def segment_aabb(x0, y0, x1, y1, rect):
+    """First t at which the segment enters rect (0 if it starts inside), or None"""
+    rx, ry, rw, rh = rect
+    if rx <= x0 <= rx + rw and ry <= y0 <= ry + rh:
+        return 0.0
+    hit = _ray_box(x0, y0, x1 - x0, y1 - y0, rx, ry, rx + rw, ry + rh)
+    if hit is None or hit[0] < 0:
+        return None
+    return hit[0]
+
+
+def reflect(vel_x, vel_y, nx, ny, restitution=1.0):
+    """Bounce a velocity off a surface with normal (nx, ny)"""
+    dot = vel_x * nx + vel_y * ny
+    if dot >= 0:
+        return vel_x, vel_y
+    return vel_x - (1 + restitution) * dot * nx, vel_y - (1 + restitution) * dot * ny
@@ -0,0 +1,83 @@
+import pickle
+import struct
+from src import quantize
+
+# Every message on the wire is a 4-byte big-endian length followed by the
+# payload: a bit-packed world snapshot (src/quantize.py) or a pickle for
+# everything else. Without the length prefix a single recv() can return
+# half a snapshot (or two of them) once the world state grows past one
+# packet.
+
+HEADER = struct.Struct("!I")
+# Largest payload we accept. A full snapshot of a thousand players is a
+# few hundred KB; anything bigger is a broken or hostile peer, and the
+# connection is dropped before a buffer is allocated for it.
+MAX_FRAME = 4 * 1024 * 1024
+
+
+def check_frame_size(size):
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Frame of {size} bytes is over the {MAX_FRAME} byte limit")
+
+
+def recv_exact(sock, size):
+    """Read exactly `size` bytes, or return None if the socket closed"""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:], size - got)
+        if n == 0:
+            return None
+        got += n
+    return buf
+
+
+def recv_frame(sock):
+    """Read one framed message and return its raw payload bytes"""
+    header = recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    try:
+        check_frame_size(size)
+    except ConnectionError:
+        # The stream can't be resynchronised after a bad header
+        sock.close()
+        raise
+    return recv_exact(sock, size)
+
+
+def encode_frame(payload):
+    """Length prefix + payload, ready to send to any number of sockets"""
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_frame(sock, payload):
+    """Send an already-serialized payload. Returns bytes written."""
+    sock.sendall(encode_frame(payload))
+    return HEADER.size + len(payload)
+
+
+def send_encoded(sock, frame):
+    """Send a frame from encode_frame() without copying it. Returns bytes written."""
+    sock.sendall(memoryview(frame))
+    return len(frame)
+
+
+def decode_payload(payload):
+    """World snapshots are bit-packed (src/quantize.py); everything else is a pickle"""
+    if payload[:1] == quantize.MAGIC:
+        return quantize.decode_world(payload)
+    return pickle.loads(payload)
+
+
+def recv_msg(sock):
+    payload = recv_frame(sock)
+    if payload is None:
+        return None
+    return decode_payload(payload)
+
+
+def send_msg(sock, data):
+    return send_frame(sock, pickle.dumps(data))
@@ -0,0 +1,246 @@
+import math
+
+# Fixed-point world snapshots. Positions are stored in 1/8 pixel steps in
+# 16 bits, angles in 12 bits, health and super charge in 8, and ids as
+# small integers, then bit-packed back to back (each player's record
+# rounded up to a whole byte). A player with no projectiles is 15 bytes
+# instead of a ~250 byte pickled dict.
+#
+# The dequantize_* helpers only use arithmetic, so they work on NumPy
+# arrays too (replay files store the same fixed-point values).
+
+TAU = 2 * math.pi
+
+POSITION_SCALE = 8      # steps per pixel
+POSITION_BITS = 16
+POSITION_MIN = -512     # bullets fly a little past the arena edge before they are dropped
+POSITION_MAX = POSITION_MIN + ((1 << POSITION_BITS) - 1) / POSITION_SCALE  # 7679.875
+VELOCITY_BITS = 12      # signed, same scale as positions: +-256 px per frame
+ANGLE_BITS = 12
+HEALTH_BITS = 8
+SUPER_BITS = 8
+GOALS_BITS = 8
+ID_BITS = 16            # player and projectile ids
+COUNT_BITS = 16         # players per snapshot
+LIST_BITS = 8           # projectiles / spent ids per player
+COLOR_BITS = 8          # per channel
+
+# First byte of a packed snapshot. Pickles start with 0x80, so a reader
+# can tell the two apart (see protocol.decode_payload).
+MAGIC = b"Q"
+
+
+def _clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+
+def quantize_position(value):
+    q = int(round((value - POSITION_MIN) * POSITION_SCALE))
+    return _clamp(q, 0, (1 << POSITION_BITS) - 1)
+
+
+def dequantize_position(q):
+    return q / POSITION_SCALE + POSITION_MIN
+
+
+def quantize_velocity(value):
+    limit = 1 << (VELOCITY_BITS - 1)
+    return _clamp(int(round(value * POSITION_SCALE)), -limit, limit - 1)
+
+
+def dequantize_velocity(q):
+    return q / POSITION_SCALE
+
+
+def quantize_angle(radians):
+    return int(round(radians / TAU * (1 << ANGLE_BITS))) & ((1 << ANGLE_BITS) - 1)
+
+
+def dequantize_angle(q):
+    """Radians in [0, 2pi)"""
+    return q * (TAU / (1 << ANGLE_BITS))
+
+
+def quantize_health(value):
+    """Whole hit points (health and super charge are 0-100)"""
+    return _clamp(int(round(value)), 0, (1 << HEALTH_BITS) - 1)
+
+
+class BitWriter:
+    """Packs unsigned/signed fields of any width, least significant bit first"""
+    def __init__(self):
+        self.out = bytearray()
+        self.acc = 0
+        self.bits = 0
+
+    def write(self, value, bits):
+        self.acc |= (value & ((1 << bits) - 1)) << self.bits
+        self.bits += bits
+        while self.bits >= 8:
+            self.out.append(self.acc & 0xFF)
+            self.acc >>= 8
+            self.bits -= 8
+
+    def write_signed(self, value, bits):
+        self.write(value, bits)  # two's complement falls out of the mask
+
+    def getvalue(self):
+        """Everything written so far, padded to a whole byte"""
+        if self.bits:
+            return bytes(self.out) + bytes((self.acc,))
+        return bytes(self.out)
+
+
+class BitReader:
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.pos = offset
+        self.acc = 0
+        self.bits = 0
+
+    def read(self, bits):
+        while self.bits < bits:
+            if self.pos >= len(self.data):
+                raise ValueError("Packed data ended early")
+            self.acc |= self.data[self.pos] << self.bits
+            self.pos += 1
+            self.bits += 8
+        value = self.acc & ((1 << bits) - 1)
+        self.acc >>= bits
+        self.bits -= bits
+        return value
+
+    def align(self):
+        """Skip to the next byte boundary"""
+        self.acc = 0
+        self.bits = 0
+
+    def read_signed(self, bits):
+        value = self.read(bits)
+        if value >= 1 << (bits - 1):
+            value -= 1 << bits
+        return value
+
+
+def _check_id(p_id):
+    # BitWriter would silently mask it into some other player's id
+    if not 0 <= p_id < 1 << ID_BITS:
+        raise ValueError(f"Player id {p_id} doesn't fit in {ID_BITS} bits")
+
+
+def _write_projectile(w, proj):
+    w.write(int(proj["id"]), ID_BITS)
+    w.write(quantize_position(proj["x"]), POSITION_BITS)
+    w.write(quantize_position(proj["y"]), POSITION_BITS)
+    w.write_signed(quantize_velocity(proj.get("vel_x", 0)), VELOCITY_BITS)
+    w.write_signed(quantize_velocity(proj.get("vel_y", 0)), VELOCITY_BITS)
+    w.write(1 if proj.get("is_super") else 0, 1)
+
+
+def _read_projectile(r):
+    return {
+        "id": r.read(ID_BITS),
+        "x": dequantize_position(r.read(POSITION_BITS)),
+        "y": dequantize_position(r.read(POSITION_BITS)),
+        "vel_x": dequantize_velocity(r.read_signed(VELOCITY_BITS)),
+        "vel_y": dequantize_velocity(r.read_signed(VELOCITY_BITS)),
+        "is_super": bool(r.read(1)),
+    }
+
+
+def encode_player(p_id, p):
+    """One player's record. Records are whole bytes, so a snapshot can be
+    put together from records encoded once and shared (see pack_world)."""
+    projectiles = p.get("projectiles", ())[:(1 << LIST_BITS) - 1]
+    spent = p.get("spent", ())[:(1 << LIST_BITS) - 1]
+    _check_id(p_id)
+    w = BitWriter()
+    w.write(p_id, ID_BITS)
+    w.write(quantize_position(p["x"]), POSITION_BITS)
+    w.write(quantize_position(p["y"]), POSITION_BITS)
+    w.write(quantize_angle(p.get("angle", 0)), ANGLE_BITS)
+    w.write(quantize_health(p["health"]), HEALTH_BITS)
+    w.write(quantize_health(p.get("super_charge", 0)), SUPER_BITS)
+    w.write(1 if p["alive"] else 0, 1)
+    for channel in p.get("color", (0, 0, 0)):
+        w.write(channel, COLOR_BITS)
+    w.write(len(projectiles), LIST_BITS)
+    w.write(len(spent), LIST_BITS)
+    for proj in projectiles:
+        _write_projectile(w, proj)
+    for proj_id in spent:
+        w.write(int(proj_id), ID_BITS)
+    return w.getvalue()
+
+
+def pack_world(records, ball=None, full=True, removed=()):
+    """Snapshot from encode_player() records.
+
+    A full snapshot is the whole world. A partial one (full=False) only
+    has the players that changed enough to be worth sending, plus the ids
+    of players the receiver should forget; the client merges it into what
+    it has (see network.merge_world).
+    """
+    w = BitWriter()
+    w.write(1 if full else 0, 1)
+    w.write(1 if ball else 0, 1)
+    if ball:
+        w.write(quantize_position(ball["x"]), POSITION_BITS)
+        w.write(quantize_position(ball["y"]), POSITION_BITS)
+        w.write_signed(quantize_velocity(ball["vel_x"]), VELOCITY_BITS)
+        w.write_signed(quantize_velocity(ball["vel_y"]), VELOCITY_BITS)
+        w.write(ball["goals_left"], GOALS_BITS)
+        w.write(ball["goals_right"], GOALS_BITS)
+    w.write(len(removed), COUNT_BITS)
+    for p_id in removed:
+        _check_id(p_id)
+        w.write(p_id, ID_BITS)
+    w.write(len(records), COUNT_BITS)
+    return MAGIC + w.getvalue() + b"".join(records)
+
+
+def encode_world(players, ball=None):
+    """Pack a full {"players": ..., "ball": ...} snapshot. Only the fields
+    clients use are kept; ids must be ints below 2**ID_BITS."""
+    return pack_world([encode_player(p_id, p) for p_id, p in players.items()], ball)
+
+
+def decode_world(data):
+    """Inverse of pack_world: {"players": {id: dict}, "ball": dict or None,
+    "full": bool, "removed": [ids]}"""
+    if data[:1] != MAGIC:
+        raise ValueError("Not a packed snapshot")
+    r = BitReader(data, 1)
+    full = bool(r.read(1))
+    ball = None
+    if r.read(1):
+        ball = {
+            "x": dequantize_position(r.read(POSITION_BITS)),
+            "y": dequantize_position(r.read(POSITION_BITS)),
+            "vel_x": dequantize_velocity(r.read_signed(VELOCITY_BITS)),
+            "vel_y": dequantize_velocity(r.read_signed(VELOCITY_BITS)),
+            "goals_left": r.read(GOALS_BITS),
+            "goals_right": r.read(GOALS_BITS),
+        }
+    removed = [r.read(ID_BITS) for _ in range(r.read(COUNT_BITS))]
+    players = {}
+    for _ in range(r.read(COUNT_BITS)):
+        r.align()
+        p_id = r.read(ID_BITS)
+        p = {
+            "id": p_id,
+            "x": dequantize_position(r.read(POSITION_BITS)),
+            "y": dequantize_position(r.read(POSITION_BITS)),
+            "angle": dequantize_angle(r.read(ANGLE_BITS)),
+            "health": r.read(HEALTH_BITS),
+            "super_charge": r.read(SUPER_BITS),
+            "alive": bool(r.read(1)),
+            "color": (r.read(COLOR_BITS), r.read(COLOR_BITS), r.read(COLOR_BITS)),
+        }
+        n_projectiles = r.read(LIST_BITS)
+        n_spent = r.read(LIST_BITS)
+        p["projectiles"] = [_read_projectile(r) for _ in range(n_projectiles)]
+        p["spent"] = [r.read(ID_BITS) for _ in range(n_spent)]
+        players[p_id] = p
+    return {"players": players, "ball": ball, "full": full, "removed": removed}
+
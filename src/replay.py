@@ -0,0 +1,238 @@
+import mmap
+import os
+import struct
+import numpy as np
+from src.quantize import quantize_position, quantize_velocity, quantize_angle, quantize_health
+
+# Replay file layout:
+#   [header][record 0][record 1]...[record N-1][index][footer]
+# Every record is the same size, so the records region is one big
+# NumPy structured array that can be viewed straight out of the mmap.
+# The index is a sorted list of (tick, offset) pairs and the footer
+# points back at it.
+#
+# Positions, velocities, angles and health are stored in the same fixed
+# point as network snapshots; use the dequantize_* functions in
+# src/quantize.py (they work on whole arrays) to get pixels and radians.
+
+MAGIC = b"NWRP"
+INDEX_MAGIC = b"NWIX"
+VERSION = 2
+
+# magic, version, max_players, max_projectiles, tick_rate
+HEADER = struct.Struct("<4sHHHH")
+# index_offset, index_count, magic
+FOOTER = struct.Struct("<QQ4s")
+
+MAX_PLAYERS = 16
+MAX_PROJECTILES = 128
+
+PLAYER_DTYPE = np.dtype([
+    ("id", "<u2"),
+    ("x", "<u2"),
+    ("y", "<u2"),
+    ("angle", "<u2"),
+    ("health", "u1"),
+    ("super_charge", "u1"),
+    ("alive", "u1"),
+    ("projectile_count", "u1"),
+    ("color", "u1", (3,)),
+])
+
+PROJECTILE_DTYPE = np.dtype([
+    ("id", "<u2"),
+    ("owner", "<u2"),
+    ("x", "<u2"),
+    ("y", "<u2"),
+    ("vel_x", "<i2"),
+    ("vel_y", "<i2"),
+    ("is_super", "u1"),
+])
+
+BALL_DTYPE = np.dtype([
+    ("x", "<u2"),
+    ("y", "<u2"),
+    ("vel_x", "<i2"),
+    ("vel_y", "<i2"),
+])
+
+INDEX_DTYPE = np.dtype([("tick", "<u4"), ("offset", "<u8")])
+
+
+def record_dtype(max_players=MAX_PLAYERS, max_projectiles=MAX_PROJECTILES):
+    """Build the fixed-size per-tick record type for the given capacities"""
+    return np.dtype([
+        ("tick", "<u4"),
+        ("time", "<f8"),
+        ("ball", BALL_DTYPE),
+        ("player_count", "<u2"),
+        ("projectile_count", "<u2"),
+        ("players", PLAYER_DTYPE, (max_players,)),
+        ("projectiles", PROJECTILE_DTYPE, (max_projectiles,)),
+    ])
+
+
+class ReplayWriter:
+    """Appends one fixed-size record per tick and writes the index on close"""
+    def __init__(self, path, tick_rate=30, max_players=MAX_PLAYERS, max_projectiles=MAX_PROJECTILES):
+        self.path = path
+        self.tick_rate = tick_rate
+        self.max_players = max_players
+        self.max_projectiles = max_projectiles
+        self.dtype = record_dtype(max_players, max_projectiles)
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, max_players, max_projectiles, tick_rate))
+        self.offset = HEADER.size
+        self.index = []
+        self.closed = False
+
+        # Reused scratch record so writing a tick doesn't allocate a new array
+        self._record = np.zeros(1, dtype=self.dtype)
+
+    def write_tick(self, tick, timestamp, players, ball=None):
+        """Record one tick of world state.
+
+        players is the server's {player_id: player_dict} mapping, ball is
+        an optional (x, y, vel_x, vel_y) tuple.
+        """
+        rec = self._record
+        rec.fill(0)
+        r = rec[0]
+        r["tick"] = tick
+        r["time"] = timestamp
+        if ball is not None:
+            x, y, vel_x, vel_y = ball
+            r["ball"] = (quantize_position(x), quantize_position(y), quantize_velocity(vel_x), quantize_velocity(vel_y))
+
+        n_players = 0
+        n_proj = 0
+        for p_id, p in list(players.items()):
+            if n_players >= self.max_players:
+                break
+            slot = r["players"][n_players]
+            slot["id"] = p_id
+            slot["x"] = quantize_position(p["x"])
+            slot["y"] = quantize_position(p["y"])
+            slot["angle"] = quantize_angle(p.get("angle", 0))
+            slot["health"] = quantize_health(p["health"])
+            slot["super_charge"] = quantize_health(p.get("super_charge", 0))
+            slot["alive"] = p["alive"]
+            slot["color"] = p.get("color", (0, 0, 0))
+
+            owned = 0
+            for proj in p.get("projectiles", []):
+                if n_proj >= self.max_projectiles:
+                    break
+                ps = r["projectiles"][n_proj]
+                ps["id"] = proj["id"]
+                ps["owner"] = p_id
+                ps["x"] = quantize_position(proj["x"])
+                ps["y"] = quantize_position(proj["y"])
+                ps["vel_x"] = quantize_velocity(proj.get("vel_x", 0))
+                ps["vel_y"] = quantize_velocity(proj.get("vel_y", 0))
+                ps["is_super"] = proj.get("is_super", False)
+                n_proj += 1
+                owned += 1
+            slot["projectile_count"] = min(owned, 255)
+            n_players += 1
+
+        r["player_count"] = n_players
+        r["projectile_count"] = n_proj
+
+        self.file.write(rec.tobytes())
+        self.index.append((tick, self.offset))
+        self.offset += self.dtype.itemsize
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        index = np.array(self.index, dtype=INDEX_DTYPE)
+        index.sort(order="tick", kind="stable")
+        self.file.write(index.tobytes())
+        self.file.write(FOOTER.pack(self.offset, len(index), INDEX_MAGIC))
+        self.file.close()
+
+
+class ReplayReader:
+    """Memory-maps a replay file and exposes zero-copy NumPy views of it"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, max_players, max_projectiles, tick_rate = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+
+        self.max_players = max_players
+        self.max_projectiles = max_projectiles
+        self.tick_rate = tick_rate
+        self.dtype = record_dtype(max_players, max_projectiles)
+
+        # Use the footer index if the file was closed cleanly, otherwise
+        # recover whatever whole records made it to disk
+        index_offset, index_count, index_magic = (0, 0, b"")
+        if size >= HEADER.size + FOOTER.size:
+            index_offset, index_count, index_magic = FOOTER.unpack_from(self.mm, size - FOOTER.size)
+
+        if index_magic == INDEX_MAGIC:
+            count = (index_offset - HEADER.size) // self.dtype.itemsize
+            self.records = np.frombuffer(self.mm, dtype=self.dtype, count=count, offset=HEADER.size)
+            self.index = np.frombuffer(self.mm, dtype=INDEX_DTYPE, count=index_count, offset=index_offset)
+        else:
+            count = (size - HEADER.size) // self.dtype.itemsize
+            self.records = np.frombuffer(self.mm, dtype=self.dtype, count=count, offset=HEADER.size)
+            self.index = np.empty(count, dtype=INDEX_DTYPE)
+            self.index["tick"] = self.records["tick"]
+            self.index["offset"] = HEADER.size + np.arange(count, dtype=np.uint64) * self.dtype.itemsize
+            self.index.sort(order="tick", kind="stable")
+
+    def __len__(self):
+        return len(self.records)
+
+    def _position(self, offsets):
+        return (offsets - HEADER.size) // self.dtype.itemsize
+
+    def tick(self, tick):
+        """Return the record for a single tick (a view, no copy)"""
+        i = np.searchsorted(self.index["tick"], tick)
+        if i >= len(self.index) or self.index["tick"][i] != tick:
+            raise KeyError(tick)
+        return self.records[int(self._position(self.index["offset"][i]))]
+
+    def ticks(self, start, stop):
+        """Return records for ticks in [start, stop).
+
+        Ticks are written in order, so this is a plain slice of the
+        mmapped array and nothing is copied.
+        """
+        ticks = self.index["tick"]
+        lo = np.searchsorted(ticks, start, side="left")
+        hi = np.searchsorted(ticks, stop, side="left")
+        if lo >= hi:
+            return self.records[0:0]
+        first = int(self._position(self.index["offset"][lo]))
+        return self.records[first:first + (hi - lo)]
+
+    def players(self, start=None, stop=None):
+        """Player table for a tick range, shape (ticks, max_players)"""
+        recs = self.records if start is None else self.ticks(start, stop)
+        return recs["players"]
+
+    def close(self):
+        # Views into the mmap must be dropped before it can be closed
+        self.records = None
+        self.index = None
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
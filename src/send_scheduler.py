@@ -0,0 +1,138 @@
+import math
+from src.protocol import encode_frame
+from src.quantize import pack_world
+
+# Per-client snapshot pacing. Clients still get an answer to every message
+# (they wait for it), but only some answers carry world state: the
+# scheduler picks a send rate for each client from a byte budget, and
+# within each send fills the budget with the players that matter most to
+# that client. Everything else gets a 10-byte "nothing new" frame.
+#
+# The budget comes from delay-based congestion control on the measured
+# round trip: when the RTT climbs above the best one seen, our frames are
+# queueing on the link, so the budget shrinks; while it stays low the
+# budget grows, but never far past what the client has actually been
+# receiving.
+#
+# Which players go in is decided by a priority accumulator: every tick a
+# player isn't sent, its priority grows by a weight that falls off with
+# distance from the receiving player. Near enemies are sent every time,
+# far ones when they have waited long enough, and nobody starves.
+
+MIN_RATE = 10                 # Hz, even on the worst link
+START_BANDWIDTH = 48 * 1024   # bytes/s
+MIN_BANDWIDTH = 4 * 1024
+MAX_BANDWIDTH = 512 * 1024
+GROWTH = 16 * 1024            # bytes/s added per second while the link looks clear
+BACKOFF = 0.75                # budget multiplier when a queue is building
+QUEUE_DELAY = 0.03            # s of RTT above the minimum that counts as queueing
+NEAR_DISTANCE = 400           # px at which a player's weight halves
+NEW_PLAYER_PRIORITY = 1000.0  # players the client has never seen go first
+HEADER_BYTES = 8              # framing + packed header, near enough
+
+EMPTY_FRAME = encode_frame(pack_world([], None, full=False))
+
+
+class SendScheduler:
+    def __init__(self, tick_rate=30, max_bandwidth=MAX_BANDWIDTH):
+        self.tick_rate = tick_rate
+        self.rate = float(tick_rate)
+        self.bandwidth = float(START_BANDWIDTH)
+        self.max_bandwidth = max_bandwidth
+        self.min_rtt = None
+        self.last_adjust = None
+        # Bytes/s actually sent over the last second
+        self.throughput = 0.0
+        self.window_start = None
+        self.window_bytes = 0
+        self.priority = {}
+        self.known = set()  # players the client has been sent and not told to drop
+        self.last_tick = 0
+        self.next_send = 0.0
+
+    def on_rtt(self, rtt, now):
+        """Adjust the budget from a (smoothed) round-trip time"""
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        if self.last_adjust is None:
+            self.last_adjust = now
+            return
+        elapsed = now - self.last_adjust
+        if rtt > self.min_rtt + QUEUE_DELAY:
+            # Back off at most once per round trip, so one queue isn't punished twice
+            if elapsed >= rtt:
+                self.bandwidth = max(MIN_BANDWIDTH, self.bandwidth * BACKOFF)
+                self.last_adjust = now
+        else:
+            ceiling = min(self.max_bandwidth, max(START_BANDWIDTH, 2 * self.throughput))
+            if self.bandwidth < ceiling:
+                self.bandwidth = min(ceiling, self.bandwidth + GROWTH * elapsed)
+            self.last_adjust = now
+
+    def _count(self, nbytes, now):
+        if self.window_start is None:
+            self.window_start = now
+        self.window_bytes += nbytes
+        if now - self.window_start >= 1.0:
+            self.throughput = self.window_bytes / (now - self.window_start)
+            self.window_start = now
+            self.window_bytes = 0
+
+    def frame(self, snapshot, me_id, visible=None, now=0.0):
+        """The frame to answer this client's message with"""
+        if snapshot.tick == self.last_tick or now < self.next_send:
+            self._count(len(EMPTY_FRAME), now)
+            return EMPTY_FRAME
+        ticks = snapshot.tick - self.last_tick
+        self.last_tick = snapshot.tick
+        players = snapshot.players
+        records = snapshot.records
+        candidates = players if visible is None else visible
+
+        removed = [p_id for p_id in self.known
+                   if p_id not in players or (visible is not None and p_id not in visible)]
+        for p_id in removed:
+            self.known.discard(p_id)
+            self.priority.pop(p_id, None)
+
+        size = HEADER_BYTES + 2 * len(removed) + (10 if snapshot.ball else 0)
+        chosen = []
+        me = players.get(me_id)
+        if me:
+            # Our own health, super and spent projectiles always go
+            chosen.append(me_id)
+            size += len(records[me_id])
+        wanted = size
+
+        ranked = []
+        for p_id in candidates:
+            if p_id == me_id:
+                continue
+            if p_id in self.known:
+                distance = math.hypot(players[p_id]["x"] - me["x"], players[p_id]["y"] - me["y"]) if me else 0.0
+                priority = self.priority.get(p_id, 0.0) + ticks / (1.0 + distance / NEAR_DISTANCE)
+            else:
+                priority = NEW_PLAYER_PRIORITY
+            self.priority[p_id] = priority
+            ranked.append((priority, p_id))
+            wanted += len(records[p_id])
+
+        # Everyone at the full tick rate if the budget allows, otherwise
+        # slow down to MIN_RATE before leaving anybody out
+        self.rate = max(MIN_RATE, min(self.tick_rate, self.bandwidth / wanted))
+        budget = self.bandwidth / self.rate
+        ranked.sort(reverse=True)
+        for _, p_id in ranked:
+            n = len(records[p_id])
+            if size + n > budget:
+                continue
+            chosen.append(p_id)
+            size += n
+            self.priority[p_id] = 0.0
+            self.known.add(p_id)
+
+        interval = 1.0 / self.rate
+        self.next_send = max(self.next_send + interval, now - interval)
+        frame = snapshot.partial_frame(chosen, removed)
+        self._count(len(frame), now)
+        return frame
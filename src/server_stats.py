@@ -0,0 +1,205 @@
+import json
+import socket
+import sys
+import threading
+import time
+from collections import deque, Counter
+from _thread import start_new_thread
+
+# Phase timings use perf_counter (monotonic, sub-microsecond). Each phase
+# keeps a window of recent samples; percentiles are only computed when
+# somebody asks for a report, so recording a sample is just an append.
+
+WINDOW = 2000
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100.0))
+    return sorted_values[i]
+
+
+class PhaseTimer:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        values = sorted(self.samples)
+        return {
+            "count": self.count,
+            "avg_ms": round((sum(values) / len(values) * 1000) if values else 0.0, 3),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "max_ms": round((values[-1] * 1000) if values else 0.0, 3),
+        }
+
+
+class ConnectionStats:
+    def __init__(self, addr):
+        self.addr = addr
+        self.connected_at = time.time()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.msgs_in = 0
+        self.msgs_out = 0
+        self.rtt = 0.0  # smoothed, see threaded_client in server.py
+        self.send_rate = 0.0  # snapshots/s and byte budget picked by src/send_scheduler.py
+        self.budget = 0.0
+
+    def summary(self):
+        return {
+            "addr": str(self.addr),
+            "uptime_s": round(time.time() - self.connected_at, 1),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "msgs_in": self.msgs_in,
+            "msgs_out": self.msgs_out,
+            "rtt_ms": round(self.rtt * 1000, 1),
+            "send_hz": round(self.send_rate, 1),
+            "budget_kb_s": round(self.budget / 1024, 1),
+        }
+
+
+class SamplingProfiler:
+    """Periodically samples every thread's stack and counts hot frames.
+
+    Costs nothing while stopped; while running it wakes up every
+    `interval` seconds, so it can be left on during a laggy match.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.running = False
+        self.samples = Counter()
+        self.total = 0
+        # start/stop come from stats requests on other threads; the lock
+        # keeps them, the sampler's writes and top() from interleaving
+        self.lock = threading.Lock()
+        self.stopped = None  # Event of the current sampler thread
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            self.samples.clear()
+            self.total = 0
+            # Each sampler watches its own event, so one that is still
+            # finishing its last sleep can't be revived by the next start
+            self.stopped = threading.Event()
+            start_new_thread(self._run, (self.stopped,))
+
+    def stop(self):
+        with self.lock:
+            if self.stopped:
+                self.stopped.set()
+            self.running = False
+
+    def _run(self, stopped):
+        me = threading.get_ident()
+        while not stopped.is_set():
+            with self.lock:
+                if stopped.is_set():
+                    return
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me:
+                        continue
+                    code = frame.f_code
+                    self.samples[f"{code.co_name} ({code.co_filename.split('/')[-1]}:{frame.f_lineno})"] += 1
+                    self.total += 1
+            stopped.wait(self.interval)
+
+    def top(self, n=15):
+        with self.lock:
+            if not self.total:
+                return []
+            return [(name, round(count * 100.0 / self.total, 1)) for name, count in self.samples.most_common(n)]
+
+
+class ServerStats:
+    def __init__(self):
+        self.phases = {}
+        self.connections = {}
+        self.profiler = SamplingProfiler()
+        self.started_at = time.time()
+
+    def now(self):
+        return time.perf_counter()
+
+    def record(self, phase, start):
+        """Record time spent in `phase` since `start` (a now() value). Returns now()."""
+        end = time.perf_counter()
+        timer = self.phases.get(phase)
+        if timer is None:
+            timer = self.phases.setdefault(phase, PhaseTimer())
+        timer.add(end - start)
+        return end
+
+    def connect(self, conn_id, addr):
+        stats = ConnectionStats(addr)
+        self.connections[conn_id] = stats
+        return stats
+
+    def disconnect(self, conn_id):
+        self.connections.pop(conn_id, None)
+
+    def report(self):
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "phases": {name: timer.summary() for name, timer in list(self.phases.items())},
+            "connections": {str(cid): c.summary() for cid, c in list(self.connections.items())},
+            "profiler": {"running": self.profiler.running, "top": self.profiler.top()},
+        }
+
+    def log_line(self):
+        """One-line summary suitable for a periodic console log"""
+        parts = []
+        for name, timer in list(self.phases.items()):
+            s = timer.summary()
+            parts.append(f"{name} p50={s['p50_ms']:.2f} p99={s['p99_ms']:.2f} max={s['max_ms']:.2f}")
+        total_in = sum(c.bytes_in for c in list(self.connections.values()))
+        total_out = sum(c.bytes_out for c in list(self.connections.values()))
+        return (f"[stats] {len(self.connections)} conns, in={total_in}B out={total_out}B | "
+                + " | ".join(parts))
+
+    def start_logging(self, interval=10.0):
+        def log_loop():
+            while True:
+                time.sleep(interval)
+                if self.phases:
+                    print(self.log_line())
+        start_new_thread(log_loop, ())
+
+    def serve(self, port=5556):
+        """Local stats endpoint. Send one line, get JSON back.
+
+        Commands: "stats", "profile on", "profile off"
+        e.g.  echo stats | nc 127.0.0.1 5556
+        """
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(("127.0.0.1", port))
+        listener.listen(2)
+
+        def serve_loop():
+            while True:
+                conn, _ = listener.accept()
+                try:
+                    command = conn.recv(256).decode(errors="ignore").strip().lower()
+                    if command == "profile on":
+                        self.profiler.start()
+                    elif command == "profile off":
+                        self.profiler.stop()
+                    conn.sendall((json.dumps(self.report(), indent=2) + "\n").encode())
+                except socket.error:
+                    pass
+                finally:
+                    conn.close()
+        start_new_thread(serve_loop, ())
@@ -0,0 +1,65 @@
+import threading
+import time
+from src.protocol import encode_frame
+from src.quantize import encode_player, pack_world
+
+# Encode-once broadcast. The simulation publishes the world once per tick;
+# the snapshot packs (src/quantize.py) and frames it a single time and
+# every connection sends those same bytes. Clients that need a filtered
+# view (fog of war) or a partial update get frames assembled from the same
+# per-player records, and clients that see the same set of players share
+# one.
+
+
+class Snapshot:
+    def __init__(self, tick, players, ball, time=0.0):
+        self.tick = tick
+        self.players = players
+        self.ball = ball
+        self.time = time  # simulation time of the tick that produced it
+        # Each player is packed once; full and partial frames reuse the bytes
+        self.records = {p_id: encode_player(p_id, p) for p_id, p in players.items()}
+        self.frame = encode_frame(pack_world(list(self.records.values()), ball))
+        self.variants = {}
+        self.lock = threading.Lock()
+
+    def frame_for(self, visible_ids=None):
+        """Framed bytes for a client that sees only visible_ids (None = everyone)"""
+        if visible_ids is None:
+            return self.frame
+        key = frozenset(visible_ids)
+        if len(key) == len(self.players):
+            return self.frame
+        with self.lock:
+            frame = self.variants.get(key)
+            if frame is None:
+                frame = encode_frame(pack_world([self.records[p_id] for p_id in key], self.ball))
+                self.variants[key] = frame
+        return frame
+
+    def partial_frame(self, ids, removed=()):
+        """Framed update with just these players (see src/send_scheduler.py)"""
+        return encode_frame(pack_world([self.records[p_id] for p_id in ids], self.ball, False, removed))
+
+
+class SnapshotPublisher:
+    def __init__(self):
+        self.tick = 0
+        self.latest = Snapshot(0, {}, None)
+        self.changed = threading.Condition()
+
+    def publish(self, players, ball=None, now=None):
+        """players must not be changed after this; readers share it"""
+        self.tick += 1
+        snapshot = Snapshot(self.tick, players, ball, time.time() if now is None else now)
+        with self.changed:
+            self.latest = snapshot  # a single reference swap, safe to read from any thread
+            self.changed.notify_all()
+        return snapshot
+
+    def wait(self, after_tick, timeout=None):
+        """Block until there is a snapshot newer than after_tick (or the
+        timeout passes) and return the latest one"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.latest.tick > after_tick, timeout)
+            return self.latest
@@ -0,0 +1,41 @@
+import math
+
+# Uniform grid spatial index. Items are bucketed by the cells their
+# bounding box covers, so "what is inside this rectangle?" only looks at
+# the handful of cells the rectangle overlaps instead of every item.
+# Static things (walls) are inserted once; moving things can be cleared
+# and re-inserted every frame, which is a dict append per item.
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells = {}
+
+    def _range(self, x, y, w, h):
+        cs = self.cell_size
+        return (int(math.floor(x / cs)), int(math.floor(y / cs)),
+                int(math.floor((x + w) / cs)), int(math.floor((y + h) / cs)))
+
+    def insert(self, item, x, y, w=0, h=0):
+        """Add item with bounding box (x, y, w, h); a point if w = h = 0"""
+        c0, r0, c1, r1 = self._range(x, y, w, h)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                self.cells.setdefault((c, r), []).append(item)
+
+    def query(self, x, y, w, h):
+        """Items whose cells overlap the rectangle (may include near misses)"""
+        c0, r0, c1, r1 = self._range(x, y, w, h)
+        found = []
+        seen = set()
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                for item in self.cells.get((c, r), ()):
+                    if id(item) not in seen:
+                        seen.add(id(item))
+                        found.append(item)
+        return found
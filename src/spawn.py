@@ -0,0 +1,142 @@
+import random
+import threading
+import numpy as np
+from src.navigation import wall_rects
+
+# Spawn points without a rejection loop. At startup we lay a grid of
+# candidate points over the arena and keep only the ones clear of walls.
+# Every candidate also has a "danger" count: how many living players are
+# within min_distance of it. Players are tracked by grid cell, so the
+# counts only change when somebody crosses into another cell. Candidates
+# with no danger sit in a set that supports O(1) random picks.
+
+
+class RandomSet:
+    """Set of ints with O(1) add, remove and uniform random choice"""
+    def __init__(self):
+        self.items = []
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        if item in self.positions:
+            return
+        self.positions[item] = len(self.items)
+        self.items.append(item)
+
+    def remove(self, item):
+        pos = self.positions.pop(item, None)
+        if pos is None:
+            return
+        last = self.items.pop()
+        if pos < len(self.items):
+            self.items[pos] = last
+            self.positions[last] = pos
+
+    def choice(self):
+        return self.items[random.randrange(len(self.items))]
+
+
+class SpawnService:
+    def __init__(self, width, height, walls, radius=30, min_distance=300, margin=100, step=40):
+        self.width = width
+        self.height = height
+        self.min_distance = min_distance
+        self.step = step
+        self.lock = threading.Lock()
+
+        # Candidate points clear of every wall (by `radius`)
+        xs = np.arange(margin, width - margin + 1, step, dtype=float)
+        ys = np.arange(margin, height - margin + 1, step, dtype=float)
+        px, py = np.meshgrid(xs, ys)
+        px = px.ravel()
+        py = py.ravel()
+        free = np.ones(len(px), dtype=bool)
+        for rx, ry, rw, rh in wall_rects(walls):
+            closest_x = np.clip(px, rx, rx + rw)
+            closest_y = np.clip(py, ry, ry + rh)
+            free &= (px - closest_x)**2 + (py - closest_y)**2 >= radius * radius
+        self.points_x = px[free]
+        self.points_y = py[free]
+        self.sides = np.where(self.points_x < width / 2, "left", "right")
+
+        # Which candidates are within min_distance of each player cell
+        # (measured from the cell centre), built lazily per cell
+        self.cols = int(np.ceil(width / step))
+        self.rows = int(np.ceil(height / step))
+        self._near = {}
+
+        self.danger = np.zeros(len(self.points_x), dtype=np.int32)
+        self.safe = {"left": RandomSet(), "right": RandomSet()}
+        for i in range(len(self.points_x)):
+            self.safe[self.sides[i]].add(i)
+
+        # player_id -> cell it is counted in (only living players are counted)
+        self.tracked = {}
+
+    def _cell(self, x, y):
+        col = min(self.cols - 1, max(0, int(x // self.step)))
+        row = min(self.rows - 1, max(0, int(y // self.step)))
+        return row, col
+
+    def _points_near(self, cell):
+        near = self._near.get(cell)
+        if near is None:
+            cx = (cell[1] + 0.5) * self.step
+            cy = (cell[0] + 0.5) * self.step
+            dist_sq = (self.points_x - cx)**2 + (self.points_y - cy)**2
+            near = np.flatnonzero(dist_sq < self.min_distance * self.min_distance)
+            self._near[cell] = near
+        return near
+
+    def _add_danger(self, cell, amount):
+        near = self._points_near(cell)
+        self.danger[near] += amount
+        # Only points that crossed between 0 and 1 change safe-set membership
+        if amount > 0:
+            for i in near[self.danger[near] == amount]:
+                self.safe[self.sides[i]].remove(i)
+        else:
+            for i in near[self.danger[near] == 0]:
+                self.safe[self.sides[i]].add(i)
+
+    def track(self, player_id, x, y, alive=True):
+        """Tell the service where a player is. Cheap unless they changed cell."""
+        cell = self._cell(x, y) if alive else None
+        with self.lock:
+            old = self.tracked.get(player_id)
+            if old == cell:
+                return
+            if old is not None:
+                self._add_danger(old, -1)
+            if cell is not None:
+                self._add_danger(cell, 1)
+            self.tracked[player_id] = cell
+
+    def untrack(self, player_id):
+        self.track(player_id, 0, 0, alive=False)
+        with self.lock:
+            self.tracked.pop(player_id, None)
+
+    def spawn(self, side=None):
+        """A wall-free point at least min_distance from every living player.
+
+        side limits it to the "left" or "right" half. If nowhere is safe,
+        returns the candidate with the fewest players nearby.
+        """
+        with self.lock:
+            sides = [side] if side else ["left", "right"]
+            total = sum(len(self.safe[s]) for s in sides)
+            if total:
+                pick = random.randrange(total)
+                for s in sides:
+                    if pick < len(self.safe[s]):
+                        i = self.safe[s].choice()
+                        break
+                    pick -= len(self.safe[s])
+            else:
+                candidates = np.flatnonzero(self.sides == side) if side else np.arange(len(self.danger))
+                i = candidates[np.argmin(self.danger[candidates])]
+            return int(self.points_x[i]), int(self.points_y[i])
@@ -0,0 +1,34 @@
+import socket
+from src.protocol import recv_msg
+
+# Spectator protocol. Read-only and push-based: after connecting, the
+# viewer never sends anything. The first message is a hello describing the
+# match,
+#
+#   {"spectator": True, "mode": "Knockout", "arena": (1920, 1080), "tick_rate": 30}
+#
+# followed by one full world state per tick, the same packed snapshot
+# frames the server replies to players with (src/quantize.py).
+#
+# server.py serves this on SPECTATOR_PORT to a handful of relays only;
+# viewers connect to a relay (relay.py), which speaks the same protocol on
+# its own port, so relays can also feed other relays.
+
+FEED_PORT = 5557   # server.py
+RELAY_PORT = 5558  # relay.py
+
+
+class SpectatorClient:
+    def __init__(self, host="127.0.0.1", port=RELAY_PORT):
+        self.sock = socket.create_connection((host, port))
+        self.info = recv_msg(self.sock)
+        if not self.info or not self.info.get("spectator"):
+            self.sock.close()
+            raise ConnectionError("Not a spectator stream")
+
+    def receive(self):
+        """Next world state, or None once the stream has ended"""
+        return recv_msg(self.sock)
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,148 @@
+import json
+import os
+from collections import OrderedDict
+import pygame
+
+# Runtime side of build_atlas.py. The atlas image is loaded once and
+# converted to the display format; every sprite is a subsurface of it, so
+# drawing an entity is one blit instead of a handful of primitive calls.
+# Anything composed at runtime (coloured bodies, health and ammo bars) is
+# rendered once and kept in a small LRU cache, and blits are queued and
+# sent to the screen in one Surface.blits() call.
+
+DEFAULT_ATLAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "atlas.json")
+
+
+class LRUCache:
+    """Surfaces by key; the least recently used one goes when full"""
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, build):
+        """Cached value for key, calling build() to make it on a miss"""
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        self.items[key] = value
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+        return value
+
+
+class SpriteBatch:
+    """Blits collected over a frame and drawn with one Surface.blits() call"""
+    def __init__(self):
+        self.blits = []
+
+    def queue(self, surf, x, y):
+        """Queue surf centred on (x, y)"""
+        w, h = surf.get_size()
+        self.blits.append((surf, (int(x) - w // 2, int(y) - h // 2)))
+
+    def queue_at(self, surf, x, y):
+        """Queue surf with its top-left corner at (x, y)"""
+        self.blits.append((surf, (int(x), int(y))))
+
+    def flush(self, surface):
+        if self.blits:
+            surface.blits(self.blits, doreturn=False)
+            self.blits = []
+
+
+class SpriteLayer:
+    def __init__(self, image, index, cache_size=256):
+        self.image = image
+        self.sprites = {}
+        for name, r in index.items():
+            self.sprites[name] = image.subsurface((r["x"], r["y"], r["w"], r["h"]))
+        self.cache = LRUCache(cache_size)
+
+    @classmethod
+    def load(cls, path=DEFAULT_ATLAS):
+        """Load an atlas built by build_atlas.py, or None if there isn't one.
+
+        Needs a display mode to be set first (for convert_alpha).
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            meta = json.load(f)
+        image = pygame.image.load(os.path.join(os.path.dirname(path), meta["image"])).convert_alpha()
+        return cls(image, meta["sprites"])
+
+    def sprite(self, name):
+        return self.sprites[name]
+
+    def body(self, name, color, radius):
+        """A sprite on a disc of `color`, so players keep their colours"""
+        def build():
+            surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, color, (radius, radius), radius)
+            inner = self.sprites[name]
+            surf.blit(inner, inner.get_rect(center=(radius, radius)))
+            return surf.convert_alpha()
+        return self.cache.get(("body", name, tuple(color), radius), build)
+
+    def tiled(self, name, width, height, tint=None):
+        """A width x height surface tiled with a sprite (walls, ground)"""
+        def build():
+            tile = self.sprites[name]
+            tw, th = tile.get_size()
+            surf = pygame.Surface((width, height), pygame.SRCALPHA)
+            surf.blits([(tile, (x, y)) for y in range(0, height, th) for x in range(0, width, tw)], doreturn=False)
+            if tint:
+                surf.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+            return surf.convert_alpha()
+        return self.cache.get(("tiled", name, width, height, tint), build)
+
+
+class BarSprites:
+    """Pre-rendered bodies and health/ammo bars, one blit each.
+
+    Health bars are keyed by their filled width in pixels, which is the
+    finest quantisation that can show on screen, so at most width + 1
+    versions of a bar exist.
+    """
+    def __init__(self, capacity=512):
+        self.cache = LRUCache(capacity)
+
+    def body(self, color, radius):
+        """Plain coloured disc, for when there is no sprite atlas"""
+        def build():
+            surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, color, (radius, radius), radius)
+            return surf
+        return self.cache.get(("body", tuple(color), radius), build)
+
+    def health(self, width, height, pct, border=2):
+        filled = max(0, min(width, int(round(width * pct))))
+
+        def build():
+            surf = pygame.Surface((width, height))
+            surf.fill((255, 0, 0))
+            surf.fill((0, 255, 0), (0, 0, filled, height))
+            if border:
+                pygame.draw.rect(surf, (255, 255, 255), (0, 0, width, height), border)
+            return surf
+        return self.cache.get(("health", width, height, filled, border), build)
+
+    def ammo(self, width, height, ammo, max_ammo):
+        def build():
+            surf = pygame.Surface((width, height), pygame.SRCALPHA)
+            segment_width = width // max_ammo
+            for i in range(max_ammo):
+                color = (255, 255, 0) if i < ammo else (100, 100, 100)
+                surf.fill(color, (i * segment_width, 0, segment_width - 1, height))
+            pygame.draw.rect(surf, (255, 255, 255), (0, 0, width, height), 2)
+            return surf
+        return self.cache.get(("ammo", width, height, int(ammo), int(max_ammo)), build)
@@ -0,0 +1,355 @@
+import itertools
+import math
+import random
+
+# Core entity state without pygame. These use __slots__ (no per-instance
+# __dict__) and never build a Rect, so the server, bots and headless
+# simulations can hold lots of them cheaply. The classes in player.py,
+# enemy.py, projectile.py, health.py and ammo.py subclass these and only
+# add drawing.
+
+MOVE_DIRECTIONS = (-1, 0, 1)
+START_DIRECTIONS = (-1, 1)
+
+# Projectile ids only need to be unique among one player's live shots, and
+# snapshots send them in 16 bits (src/quantize.py)
+_projectile_ids = itertools.count()
+
+
+class EntityState:
+    __slots__ = ("x", "y", "radius")
+
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+
+    def bounds(self):
+        """(left, top, width, height) of the bounding box"""
+        return (self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
+
+
+class ProjectileState(EntityState):
+    __slots__ = ("vel_x", "vel_y", "owner", "damage", "color", "id", "is_super")
+
+    def __init__(self, x, y, vel_x, vel_y, owner="player", damage=10, color=(255, 255, 0), radius=8, id=None, is_super=False):
+        super().__init__(x, y, radius if not is_super else 22)
+        self.vel_x = vel_x
+        self.vel_y = vel_y
+        self.owner = owner
+        self.damage = damage
+        self.color = color if not is_super else (0, 200, 255)
+        self.id = id if id is not None else next(_projectile_ids) & 0xFFFF
+        self.is_super = is_super
+
+    def update(self):
+        self.x += self.vel_x
+        self.y += self.vel_y
+
+    def is_off_screen(self, screen_width, screen_height):
+        return (self.x < -100 or self.x > screen_width + 100 or
+                self.y < -100 or self.y > screen_height + 100)
+
+
+class PlayerState(EntityState):
+    __slots__ = ("color", "vel_x", "vel_y", "speed", "health", "max_health",
+                 "ammo", "max_ammo", "shoot_cooldown", "shoot_delay", "reload_timer", "reload_delay",
+                 "health_regen_rate", "super_meter", "super_max", "super_charge_per_hit",
+                 "super_cooldown", "super_cooldown_delay", "mouse_angle")
+
+    # Class used for projectiles fired by shoot()/fire_super()
+    projectile_class = ProjectileState
+
+    def __init__(self, x, y, radius, color):
+        super().__init__(x, y, radius)
+        self.color = color
+        self.vel_x = 0
+        self.vel_y = 0
+        self.speed = 6
+        self.health = 100.0
+        self.max_health = 100.0
+
+        # Brawl-style ammo: 3 shots, then recharges over time
+        self.ammo = 3
+        self.max_ammo = 3
+        self.shoot_cooldown = 0
+        self.shoot_delay = 8  # minimal frames between actual bullet spawns
+        # reload timer: when ammo < max_ammo this counts down (frames) until one ammo is restored
+        self.reload_timer = 0
+        self.reload_delay = 120  # frames to restore one ammo (120 @60fps => 2s)
+
+        # Passive health regeneration (Managed by server for multiplayer sync)
+        self.health_regen_rate = 0.0
+
+        # Super meter
+        self.super_meter = 0.0
+        self.super_max = 100.0
+        # how much super charges per successful hit
+        self.super_charge_per_hit = 25.0
+        # super cooldown (optional) to prevent immediate reuse
+        self.super_cooldown = 0
+        self.super_cooldown_delay = 30
+
+        self.mouse_angle = 0
+
+    def aim_at(self, target_x, target_y):
+        self.mouse_angle = math.atan2(target_y - self.y, target_x - self.x)
+
+    def update(self, screen_width, screen_height):
+        # Update position
+        self.x += self.vel_x
+        self.y += self.vel_y
+
+        # Clamp to screen boundaries
+        r = self.radius
+        if self.x < r:
+            self.x = r
+        elif self.x > screen_width - r:
+            self.x = screen_width - r
+        if self.y < r:
+            self.y = r
+        elif self.y > screen_height - r:
+            self.y = screen_height - r
+
+        # Update cooldown
+        if self.shoot_cooldown > 0:
+            self.shoot_cooldown -= 1
+
+        # Passive health regen (frame-based)
+        if self.health < self.max_health and self.health_regen_rate:
+            self.health = min(self.max_health, self.health + (self.health_regen_rate / 60.0))
+
+        # Reload ammo over time when not full
+        if self.ammo < self.max_ammo:
+            if self.reload_timer > 0:
+                self.reload_timer -= 1
+            if self.reload_timer <= 0:
+                # restore one ammo
+                self.ammo += 1
+                # if still not full, restart timer, otherwise stop
+                if self.ammo < self.max_ammo:
+                    self.reload_timer = self.reload_delay
+                else:
+                    self.reload_timer = 0
+
+        # super cooldown decrement
+        if self.super_cooldown > 0:
+            self.super_cooldown -= 1
+
+    def shoot(self):
+        # Only shoot if we have ammo and the short shoot_cooldown passed
+        if self.shoot_cooldown <= 0 and self.ammo > 0:
+            self.shoot_cooldown = self.shoot_delay
+            self.ammo -= 1
+
+            if self.ammo < self.max_ammo and self.reload_timer <= 0:
+                self.reload_timer = self.reload_delay
+
+            projectile_speed = 15
+            cos_a = math.cos(self.mouse_angle)
+            sin_a = math.sin(self.mouse_angle)
+            proj_x = self.x + cos_a * (self.radius + 10)
+            proj_y = self.y + sin_a * (self.radius + 10)
+
+            return self.projectile_class(proj_x, proj_y,
+                                         cos_a * projectile_speed,
+                                         sin_a * projectile_speed,
+                                         owner="player", damage=25, color=(255, 255, 0))
+
+        return None
+
+    def fire_super(self):
+        """Fire a directional Super projectile if meter is full."""
+        if self.super_meter >= self.super_max and self.super_cooldown <= 0:
+            # consume super
+            self.super_meter = 0.0
+            self.super_cooldown = self.super_cooldown_delay
+
+            # Super projectile: much larger, slower (for effect), massive damage (one-shot)
+            projectile_speed = 10
+            proj_radius = 22
+            cos_a = math.cos(self.mouse_angle)
+            sin_a = math.sin(self.mouse_angle)
+            proj_x = self.x + cos_a * (self.radius + proj_radius + 5)
+            proj_y = self.y + sin_a * (self.radius + proj_radius + 5)
+
+            return self.projectile_class(proj_x, proj_y,
+                                         cos_a * projectile_speed,
+                                         sin_a * projectile_speed,
+                                         owner="player", damage=100, color=(0, 200, 255),
+                                         radius=proj_radius, is_super=True)
+        return None
+
+    def take_damage(self, damage):
+        self.health -= damage
+
+    def get_data(self):
+        """Clean data package for network"""
+        return {
+            "x": self.x,
+            "y": self.y,
+            "color": self.color
+        }
+
+
+class EnemyState(EntityState):
+    __slots__ = ("color", "vel_x", "vel_y", "speed", "health", "max_health",
+                 "shoot_cooldown", "shoot_delay", "target", "move_direction", "direction_change_counter",
+                 "super_meter", "super_max", "super_charge_per_hit", "super_cooldown", "super_cooldown_delay",
+                 "dodge_timer", "dodge_cooldown")
+
+    projectile_class = ProjectileState
+
+    # Projectiles closer than this trigger a dodge (compared squared)
+    DODGE_RADIUS_SQ = 150 * 150
+
+    def __init__(self, x, y, radius, color):
+        super().__init__(x, y, radius)
+        self.color = color
+        self.vel_x = 0
+        self.vel_y = 0
+        self.speed = 3
+        self.health = 50
+        self.max_health = 50
+        self.shoot_cooldown = 0
+        self.shoot_delay = 60
+        self.target = None
+        self.move_direction = random.choice(START_DIRECTIONS)
+        self.direction_change_counter = 0
+
+        # Enhanced AI
+        self.super_meter = 0.0
+        self.super_max = 100.0
+        self.super_charge_per_hit = 25.0
+        self.super_cooldown = 0
+        self.super_cooldown_delay = 30
+        self.dodge_timer = 0
+        self.dodge_cooldown = 0
+
+    def update(self, screen_width, screen_height, player_projectiles=None):
+        # Enhanced AI: smarter movement with dodging
+        self.direction_change_counter -= 1
+
+        # Dodging behavior: if enemy projectiles are nearby, try to dodge
+        if player_projectiles and self.dodge_cooldown <= 0:
+            x = self.x
+            y = self.y
+            for proj in player_projectiles:
+                dx = proj.x - x
+                dy = proj.y - y
+                if dx * dx + dy * dy < self.DODGE_RADIUS_SQ:  # Projectile in danger zone
+                    # Move perpendicular to projectile velocity
+                    self.vel_x = -proj.vel_y * 0.5
+                    self.vel_y = proj.vel_x * 0.5
+                    self.dodge_timer = 15
+                    self.dodge_cooldown = 60
+                    break
+
+        # Resume normal movement if not dodging
+        if self.dodge_timer > 0:
+            self.dodge_timer -= 1
+        else:
+            if self.direction_change_counter <= 0:
+                self.move_direction = random.choice(MOVE_DIRECTIONS)
+                self.direction_change_counter = random.randint(30, 90)
+            self.vel_x = self.move_direction * self.speed
+
+        if self.dodge_cooldown > 0:
+            self.dodge_cooldown -= 1
+
+        # Stay within bounds
+        if self.x < self.radius:
+            self.x = self.radius
+        elif self.x > screen_width - self.radius:
+            self.x = screen_width - self.radius
+
+        if self.y < self.radius:
+            self.y = self.radius
+        elif self.y > screen_height - self.radius:
+            self.y = screen_height - self.radius
+
+        self.x += self.vel_x
+        self.y += self.vel_y
+
+        # Update cooldown
+        if self.shoot_cooldown > 0:
+            self.shoot_cooldown -= 1
+
+        # Update Super cooldown
+        if self.super_cooldown > 0:
+            self.super_cooldown -= 1
+
+    def shoot_at(self, target):
+        if self.shoot_cooldown <= 0:
+            self.shoot_cooldown = self.shoot_delay
+
+            # Calculate direction to target
+            dx = target.x - self.x
+            dy = target.y - self.y
+
+            if dx or dy:
+                distance = math.sqrt(dx * dx + dy * dy)
+                cos_a = dx / distance
+                sin_a = dy / distance
+                projectile_speed = 8
+
+                proj_x = self.x + cos_a * (self.radius + 10)
+                proj_y = self.y + sin_a * (self.radius + 10)
+
+                # Charge super meter when shooting
+                self.super_meter = min(self.super_max, self.super_meter + self.super_charge_per_hit)
+
+                return self.projectile_class(proj_x, proj_y,
+                                             cos_a * projectile_speed,
+                                             sin_a * projectile_speed,
+                                             owner="enemy", damage=15, color=(255, 100, 0))
+
+        return None
+
+    def fire_super(self):
+        """Fire a directional Super projectile if meter is full."""
+        if self.super_meter >= self.super_max and self.super_cooldown <= 0:
+            self.super_meter = 0.0
+            self.super_cooldown = self.super_cooldown_delay
+
+            # Calculate direction to a random nearby point (or player if close)
+            angle = random.uniform(0, 2 * math.pi)
+            projectile_speed = 14
+            proj_radius = 25
+            proj_x = self.x + math.cos(angle) * (self.radius + proj_radius + 4)
+            proj_y = self.y + math.sin(angle) * (self.radius + proj_radius + 4)
+
+            return self.projectile_class(proj_x, proj_y,
+                                         math.cos(angle) * projectile_speed,
+                                         math.sin(angle) * projectile_speed,
+                                         owner="enemy_super", damage=100, color=(255, 100, 200), radius=proj_radius)
+        return None
+
+    def take_damage(self, damage):
+        self.health -= damage
+
+
+class PickupState(EntityState):
+    __slots__ = ("amount",)
+
+    def __init__(self, x, y, amount, radius):
+        super().__init__(x, y, radius)
+        self.amount = amount
+
+    def update(self):
+        # Pickups don't move; kept so callers can treat all entities alike
+        pass
+
+
+class HealthTokenState(PickupState):
+    __slots__ = ()
+
+    def __init__(self, x, y, amount=25):
+        super().__init__(x, y, amount, 10)
+
+
+class AmmoState(PickupState):
+    __slots__ = ()
+
+    def __init__(self, x, y, amount=2):
+        super().__init__(x, y, amount, 8)
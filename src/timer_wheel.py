@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+
+# Hierarchical timer wheel for deadline events (respawns, regen start, ...).
+# Level 0 has one slot per tick; each level above covers `slots` times the
+# span of the one below. Scheduling and cancelling are O(1), and advancing
+# one tick only touches the slot that is due (plus, every `slots` ticks, one
+# higher-level slot that gets spread back down). Nothing is polled, so
+# players with nothing pending cost nothing per tick.
+
+
+class Timer:
+    __slots__ = ("tick", "callback", "args", "cancelled")
+
+    def __init__(self, tick, callback, args):
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    def __init__(self, resolution=1.0 / 30, slots=64, levels=4, start=None):
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.start = time.time() if start is None else start
+        self.tick = 0
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []  # further away than the top level reaches
+        self.lock = threading.Lock()
+
+    def _place(self, timer):
+        delta = timer.tick - self.tick
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.slots:
+                self.wheels[level][(timer.tick // span) % self.slots].append(timer)
+                return
+            span *= self.slots
+        self.overflow.append(timer)
+
+    def call_at(self, when, callback, *args):
+        """Run callback(*args) from advance() once `when` (time.time()) has passed"""
+        with self.lock:
+            tick = max(self.tick + 1, int(math.ceil((when - self.start) / self.resolution)))
+            timer = Timer(tick, callback, args)
+            self._place(timer)
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(time.time() + delay, callback, *args)
+
+    def advance(self, now):
+        """Fire every timer due by `now`. Callbacks run on the caller's thread."""
+        target = int((now - self.start) / self.resolution)
+        due = []
+        with self.lock:
+            while self.tick < target:
+                self.tick += 1
+                # When a lower wheel wraps, spread the next higher slot down
+                span = self.slots
+                for level in range(1, self.levels):
+                    if self.tick % span:
+                        break
+                    index = (self.tick // span) % self.slots
+                    bucket = self.wheels[level][index]
+                    self.wheels[level][index] = []
+                    for timer in bucket:
+                        if not timer.cancelled:
+                            self._place(timer)
+                    span *= self.slots
+                else:
+                    if self.tick % span == 0 and self.overflow:
+                        bucket = self.overflow
+                        self.overflow = []
+                        for timer in bucket:
+                            self._place(timer)
+
+                index = self.tick % self.slots
+                bucket = self.wheels[0][index]
+                if bucket:
+                    self.wheels[0][index] = []
+                    due.extend(t for t in bucket if not t.cancelled)
+        for timer in due:
+            timer.callback(*timer.args)
+        return len(due)
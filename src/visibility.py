@@ -0,0 +1,129 @@
+import math
+import numpy as np
+from src.navigation import wall_rects
+
+# Cell-to-cell line of sight over the static walls. The arena is split
+# into cells; a cell is opaque if any wall overlaps it. can_see() walks
+# the cells between the two points with a DDA (Amanatides & Woo) the
+# first time a pair is asked about and remembers the answer, so every
+# later query is a single array lookup. The memo is one row per cell,
+# allocated the first time that cell is looked from: a full cells x cells
+# table would be half a gigabyte for a 6000x6000 arena, and only the
+# cells players actually stand in are ever needed.
+
+UNKNOWN = -1
+
+
+class VisibilityGrid:
+    def __init__(self, width, height, walls, cell_size=40):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        self.opaque = np.zeros((self.rows, self.cols), dtype=bool)
+        for rx, ry, rw, rh in wall_rects(walls):
+            c0 = max(0, int(rx // cell_size))
+            c1 = min(self.cols - 1, int((rx + rw - 1) // cell_size))
+            r0 = max(0, int(ry // cell_size))
+            r1 = min(self.rows - 1, int((ry + rh - 1) // cell_size))
+            self.opaque[r0:r1 + 1, c0:c1 + 1] = True
+
+        # {cell: row of 1 = visible, 0 = blocked, -1 = not computed yet}.
+        # A pair is stored once, in the row of its lower cell index.
+        self.table = {}
+        self.flat_opaque = self.opaque.ravel()
+
+    def cell_index(self, x, y):
+        col = min(self.cols - 1, max(0, int(x // self.cell_size)))
+        row = min(self.rows - 1, max(0, int(y // self.cell_size)))
+        return row * self.cols + col
+
+    def can_see(self, a, b):
+        """Line of sight between two points (objects with x, y or (x, y) pairs)"""
+        ax, ay = (a.x, a.y) if hasattr(a, "x") else a
+        bx, by = (b.x, b.y) if hasattr(b, "x") else b
+        return self.cells_visible(self.cell_index(ax, ay), self.cell_index(bx, by))
+
+    def _row(self, i):
+        row = self.table.get(i)
+        if row is None:
+            row = self.table[i] = np.full(self.rows * self.cols, UNKNOWN, dtype=np.int8)
+        return row
+
+    def cells_visible(self, i, j):
+        # Always trace in the same direction so the answer is symmetric
+        lo, hi = (i, j) if i <= j else (j, i)
+        row = self._row(lo)
+        known = row[hi]
+        if known != UNKNOWN:
+            return bool(known)
+        visible = self._trace(lo, hi)
+        row[hi] = visible
+        return visible
+
+    def can_see_many(self, xs, ys, tx, ty):
+        """Vectorised can_see for arrays of viewers and their targets"""
+        cols = self.cols
+        src = (np.clip((ys // self.cell_size).astype(np.int64), 0, self.rows - 1) * cols
+               + np.clip((xs // self.cell_size).astype(np.int64), 0, cols - 1))
+        dst = (np.clip((ty // self.cell_size).astype(np.int64), 0, self.rows - 1) * cols
+               + np.clip((tx // self.cell_size).astype(np.int64), 0, cols - 1))
+        lo = np.minimum(src, dst)
+        hi = np.maximum(src, dst)
+        result = np.empty(len(lo), dtype=np.int8)
+        for cell in np.unique(lo):
+            same = lo == cell
+            result[same] = self._row(int(cell))[hi[same]]
+        for k in np.flatnonzero(result == UNKNOWN):
+            result[k] = self.cells_visible(int(src[k]), int(dst[k]))
+        return result.astype(bool)
+
+    def precompute(self):
+        """Fill the whole table up front (e.g. at server start)"""
+        n = self.rows * self.cols
+        for i in range(n):
+            if self.flat_opaque[i]:
+                continue
+            row = self._row(i)
+            for j in range(i + 1, n):
+                if row[j] == UNKNOWN:
+                    self.cells_visible(i, j)
+
+    def _trace(self, i, j):
+        """Walk the cells from the centre of cell i to the centre of cell j"""
+        if i == j:
+            return True
+        opaque = self.flat_opaque
+        if opaque[i] or opaque[j]:
+            return False
+        cols = self.cols
+        r, c = divmod(i, cols)
+        r1, c1 = divmod(j, cols)
+        dx = c1 - c
+        dy = r1 - r
+        step_c = 1 if dx > 0 else -1
+        step_r = 1 if dy > 0 else -1
+        # Parametric distance (0..1 along the ray) to the next cell edge
+        t_delta_c = abs(1.0 / dx) if dx else math.inf
+        t_delta_r = abs(1.0 / dy) if dy else math.inf
+        t_max_c = 0.5 * t_delta_c
+        t_max_r = 0.5 * t_delta_r
+        while (r, c) != (r1, c1):
+            if abs(t_max_c - t_max_r) < 1e-9:
+                # Passing exactly through a corner: blocked if either side is
+                if opaque[(r + step_r) * cols + c] or opaque[r * cols + c + step_c]:
+                    return False
+                c += step_c
+                r += step_r
+                t_max_c += t_delta_c
+                t_max_r += t_delta_r
+            elif t_max_c < t_max_r:
+                c += step_c
+                t_max_c += t_delta_c
+            else:
+                r += step_r
+                t_max_r += t_delta_r
+            if opaque[r * cols + c]:
+                return False
+        return True
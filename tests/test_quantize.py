@@ -0,0 +1,147 @@
+import math
+import random
+import pytest
+from src.quantize import (
+    TAU, POSITION_SCALE, POSITION_MIN, POSITION_MAX, VELOCITY_BITS, ANGLE_BITS, ID_BITS,
+    quantize_position, dequantize_position, quantize_velocity, dequantize_velocity,
+    quantize_angle, dequantize_angle, quantize_health,
+    BitWriter, BitReader, encode_player, pack_world, encode_world, decode_world,
+)
+
+STEP = 1.0 / POSITION_SCALE
+
+
+def angle_error(a, b):
+    d = (a - b) % TAU
+    return min(d, TAU - d)
+
+
+def random_world(rng):
+    players = {}
+    for p_id in rng.sample(range(1 << ID_BITS), rng.randint(0, 12)):
+        players[p_id] = {
+            "x": rng.uniform(0, 7000), "y": rng.uniform(0, 4000),
+            "angle": rng.uniform(-math.pi, math.pi),
+            "health": rng.uniform(0, 100), "super_charge": rng.uniform(0, 100),
+            "alive": rng.random() < 0.8,
+            "color": tuple(rng.randrange(256) for _ in range(3)),
+            "last_damage_time": 0.0,  # server-only, not sent
+            "projectiles": [{"id": rng.randrange(1 << ID_BITS),
+                             "x": rng.uniform(POSITION_MIN, 7000), "y": rng.uniform(POSITION_MIN, 4000),
+                             "vel_x": rng.uniform(-30, 30), "vel_y": rng.uniform(-30, 30),
+                             "is_super": rng.random() < 0.2} for _ in range(rng.randint(0, 6))],
+            "spent": [rng.randrange(1 << ID_BITS) for _ in range(rng.randint(0, 3))],
+        }
+    ball = None
+    if rng.random() < 0.5:
+        ball = {"x": rng.uniform(0, 1920), "y": rng.uniform(0, 1080),
+                "vel_x": rng.uniform(-20, 20), "vel_y": rng.uniform(-20, 20),
+                "goals_left": rng.randint(0, 5), "goals_right": rng.randint(0, 5)}
+    return players, ball
+
+
+def test_full_world_round_trip():
+    rng = random.Random(1)
+    for _ in range(500):
+        players, ball = random_world(rng)
+        world = decode_world(encode_world(players, ball))
+        assert world["full"] and world["removed"] == []
+        assert set(world["players"]) == set(players)
+        for p_id, p in players.items():
+            q = world["players"][p_id]
+            assert abs(q["x"] - p["x"]) <= STEP / 2 and abs(q["y"] - p["y"]) <= STEP / 2
+            assert angle_error(q["angle"], p["angle"]) <= TAU / (1 << ANGLE_BITS) / 2 + 1e-9
+            assert q["health"] == round(p["health"]) and q["super_charge"] == round(p["super_charge"])
+            assert q["alive"] == p["alive"] and q["color"] == p["color"]
+            assert q["spent"] == p["spent"]
+            assert len(q["projectiles"]) == len(p["projectiles"])
+            for a, b in zip(q["projectiles"], p["projectiles"]):
+                assert a["id"] == b["id"] and a["is_super"] == b["is_super"]
+                for key in ("x", "y", "vel_x", "vel_y"):
+                    assert abs(a[key] - b[key]) <= STEP / 2
+        if ball:
+            for key in ("x", "y", "vel_x", "vel_y"):
+                assert abs(world["ball"][key] - ball[key]) <= STEP / 2
+            assert world["ball"]["goals_left"] == ball["goals_left"]
+            assert world["ball"]["goals_right"] == ball["goals_right"]
+        else:
+            assert world["ball"] is None
+
+
+def test_partial_world():
+    players = {5: {"x": 1, "y": 2, "health": 50, "alive": True},
+               9: {"x": 3, "y": 4, "health": 0, "alive": False}}
+    frame = pack_world([encode_player(9, players[9])], None, full=False, removed=[1, 2])
+    world = decode_world(frame)
+    assert not world["full"]
+    assert world["removed"] == [1, 2]
+    assert list(world["players"]) == [9]
+    assert world["players"][9]["x"] == 3 and not world["players"][9]["alive"]
+
+
+def test_empty_partial_world():
+    world = decode_world(pack_world([], None, full=False))
+    assert world == {"players": {}, "ball": None, "full": False, "removed": []}
+
+
+def test_position_offset_and_clamping():
+    # Stored relative to POSITION_MIN, so slightly negative positions survive
+    assert quantize_position(POSITION_MIN) == 0
+    assert dequantize_position(quantize_position(-100.25)) == -100.25
+    assert dequantize_position(quantize_position(-10000)) == POSITION_MIN
+    assert dequantize_position(quantize_position(10000)) == POSITION_MAX
+
+
+def test_signed_velocity():
+    limit = (1 << (VELOCITY_BITS - 1)) / POSITION_SCALE
+    assert dequantize_velocity(quantize_velocity(-3.5)) == -3.5
+    assert dequantize_velocity(quantize_velocity(1000)) == limit - STEP
+    assert dequantize_velocity(quantize_velocity(-1000)) == -limit
+    w = BitWriter()
+    for value in (-1, 0, 5, -(1 << (VELOCITY_BITS - 1)), (1 << (VELOCITY_BITS - 1)) - 1):
+        w.write_signed(value, VELOCITY_BITS)
+    r = BitReader(w.getvalue())
+    assert [r.read_signed(VELOCITY_BITS) for _ in range(5)] == [-1, 0, 5, -2048, 2047]
+
+
+def test_signed_fields_of_every_width():
+    w = BitWriter()
+    for bits in range(1, 33):
+        w.write_signed(-1, bits)
+    r = BitReader(w.getvalue())
+    assert all(r.read_signed(bits) == -1 for bits in range(1, 33))
+
+
+def test_angle_wraps():
+    assert quantize_angle(0) == 0
+    assert quantize_angle(TAU) == 0
+    assert angle_error(dequantize_angle(quantize_angle(-math.pi / 2)), -math.pi / 2) < 1e-3
+    assert 0 <= dequantize_angle(quantize_angle(-0.001)) < TAU
+
+
+def test_health_clamps():
+    assert quantize_health(-5) == 0
+    assert quantize_health(99.6) == 100
+
+
+@pytest.mark.parametrize("p_id", [0, (1 << ID_BITS) - 1])
+def test_id_edges_round_trip(p_id):
+    p = {"x": 0, "y": 0, "health": 100, "alive": True}
+    world = decode_world(pack_world([encode_player(p_id, p)], None, full=False, removed=[p_id]))
+    assert list(world["players"]) == [p_id]
+    assert world["removed"] == [p_id]
+
+
+@pytest.mark.parametrize("p_id", [-1, 1 << ID_BITS])
+def test_ids_out_of_range_are_rejected(p_id):
+    p = {"x": 0, "y": 0, "health": 100, "alive": True}
+    with pytest.raises(ValueError):
+        encode_player(p_id, p)
+    with pytest.raises(ValueError):
+        pack_world([], None, full=False, removed=[p_id])
+
+
+def test_truncated_frame_is_an_error():
+    frame = encode_world({1: {"x": 10, "y": 20, "health": 100, "alive": True}})
+    with pytest.raises(ValueError):
+        decode_world(frame[:-3])